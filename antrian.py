@@ -0,0 +1,282 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+# -----------------------------------
+# ANTRIAN JOB LATAR BELAKANG
+# -----------------------------------
+# Pekerjaan turunan setelah berita ditulis (varian gambar, pembersihan upload,
+# ekspor statis, ...) dicatat sebagai baris di file SQLite tersendiri, lalu
+# dijalankan oleh pekerja: thread di proses web (mode `thread`) atau proses
+# terpisah `flask worker` (mode `pekerja`). Antrian ada di file sendiri supaya
+# tetap lokal dan ringan walaupun DATABASE_URL menunjuk ke server lain.
+#
+# Status job: menunggu -> berjalan -> selesai | (gagal -> menunggu lagi dengan
+# jeda eksponensial) ... -> gagal setelah `maks_percobaan` kali.
+SKEMA = """
+CREATE TABLE IF NOT EXISTS job (
+    id INTEGER PRIMARY KEY,
+    nama TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    kunci TEXT,
+    status TEXT NOT NULL DEFAULT 'menunggu',
+    percobaan INTEGER NOT NULL DEFAULT 0,
+    maks_percobaan INTEGER NOT NULL,
+    dibuat REAL NOT NULL,
+    jalan_setelah REAL NOT NULL,
+    mulai REAL,
+    selesai REAL,
+    pekerja TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_job_ambil ON job (status, jalan_setelah, id);
+CREATE INDEX IF NOT EXISTS ix_job_kunci ON job (kunci, status);
+CREATE INDEX IF NOT EXISTS ix_job_selesai ON job (selesai);
+"""
+STATUS = ('menunggu', 'berjalan', 'selesai', 'gagal')
+
+
+class Job:
+    def __init__(self, id, nama, payload, percobaan, maks_percobaan, dibuat):
+        self.id = id
+        self.nama = nama
+        self.payload = payload
+        self.percobaan = percobaan
+        self.maks_percobaan = maks_percobaan
+        self.dibuat = dibuat
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.nama} percobaan {self.percobaan}/{self.maks_percobaan}>'
+
+
+class Antrian:
+    def __init__(self, path, maks_percobaan=5, jeda_dasar=2.0, batas_berjalan=600, simpan=86400, log=None):
+        self.path = path
+        self.maks_percobaan = maks_percobaan
+        self.jeda_dasar = jeda_dasar
+        # Job `berjalan` lebih lama dari ini dianggap ditinggal pekerja yang mati
+        self.batas_berjalan = batas_berjalan
+        # Riwayat job selesai (dasar metrik latensi) disimpan sekian detik
+        self.simpan = simpan
+        self.log = log or logging.getLogger(__name__)
+        self.handler = {}
+        self._lokal = threading.local()
+        self._bangun = threading.Event()
+        self._konfig_lokal = None
+        self._thread_lokal = None
+        self._kunci_lokal = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._koneksi().conn.executescript(SKEMA)
+
+    def _koneksi(self):
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            # Autocommit; transaksi tulis dibuka sendiri dengan BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._lokal.conn = conn
+        return _Transaksi(conn)
+
+    # ----- registrasi & pengiriman -----
+    def tugas(self, nama):
+        """Dekorator: daftarkan fungsi sebagai handler job `nama`; dipanggil dengan **payload."""
+        def dekorator(fungsi):
+            self.handler[nama] = fungsi
+            return fungsi
+        return dekorator
+
+    def kirim(self, nama, payload=None, kunci=None, tunda=0):
+        return self.kirim_banyak([(nama, payload, kunci)], tunda)[0]
+
+    def kirim_banyak(self, daftar, tunda=0):
+        """Masukkan [(nama, payload, kunci)] dalam satu transaksi; kembalikan id job.
+
+        Job dengan `kunci` yang sama dan masih menunggu tidak dibuat dua kali:
+        perubahan beruntun cukup dikerjakan sekali.
+        """
+        sekarang = time.time()
+        ids = []
+        with self._koneksi() as conn:
+            for nama, payload, kunci in daftar:
+                if nama not in self.handler:
+                    raise KeyError(f'handler job {nama!r} belum didaftarkan')
+                if kunci is not None:
+                    ada = conn.execute("SELECT id FROM job WHERE kunci = ? AND status = 'menunggu'",
+                                       (kunci,)).fetchone()
+                    if ada is not None:
+                        ids.append(ada[0])
+                        continue
+                kursor = conn.execute(
+                    'INSERT INTO job (nama, payload, kunci, maks_percobaan, dibuat, jalan_setelah) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (nama, json.dumps(payload or {}), kunci, self.maks_percobaan, sekarang, sekarang + tunda),
+                )
+                ids.append(kursor.lastrowid)
+        # Thread pekerja lokal (jika sudah jalan) langsung dibangunkan. Proses CLI tidak
+        # memulai thread: job-nya diambil pekerja proses web atau `flask worker`.
+        self._bangun.set()
+        return ids
+
+    # ----- sisi pekerja -----
+    def ambil(self, pekerja):
+        sekarang = time.time()
+        with self._koneksi() as conn:
+            baris = conn.execute(
+                "SELECT id, nama, payload, percobaan, maks_percobaan, dibuat FROM job "
+                "WHERE status = 'menunggu' AND jalan_setelah <= ? ORDER BY jalan_setelah, id LIMIT 1",
+                (sekarang,),
+            ).fetchone()
+            if baris is None:
+                return None
+            conn.execute(
+                "UPDATE job SET status = 'berjalan', percobaan = percobaan + 1, mulai = ?, pekerja = ? "
+                "WHERE id = ?",
+                (sekarang, pekerja, baris[0]),
+            )
+        id, nama, payload, percobaan, maks_percobaan, dibuat = baris
+        return Job(id, nama, json.loads(payload), percobaan + 1, maks_percobaan, dibuat)
+
+    def selesai(self, job):
+        with self._koneksi() as conn:
+            conn.execute("UPDATE job SET status = 'selesai', selesai = ?, error = NULL WHERE id = ?",
+                         (time.time(), job.id))
+
+    def gagal(self, job, error):
+        sekarang = time.time()
+        with self._koneksi() as conn:
+            if job.percobaan >= job.maks_percobaan:
+                conn.execute("UPDATE job SET status = 'gagal', selesai = ?, error = ? WHERE id = ?",
+                             (sekarang, error, job.id))
+            else:
+                # 2 s, 4 s, 8 s, ... sebelum dicoba lagi
+                jeda = self.jeda_dasar * 2 ** (job.percobaan - 1)
+                conn.execute("UPDATE job SET status = 'menunggu', jalan_setelah = ?, error = ? WHERE id = ?",
+                             (sekarang + jeda, error, job.id))
+
+    def jalankan(self, job, konteks=None):
+        fungsi = self.handler.get(job.nama)
+        try:
+            if fungsi is None:
+                raise KeyError(f'handler job {job.nama!r} belum didaftarkan')
+            if konteks is None:
+                fungsi(**job.payload)
+            else:
+                with konteks():
+                    fungsi(**job.payload)
+        except Exception:
+            self.log.exception('Job %s gagal (percobaan %d/%d)', job.nama, job.percobaan, job.maks_percobaan)
+            self.gagal(job, traceback.format_exc(limit=5))
+            return False
+        self.selesai(job)
+        return True
+
+    def pulihkan(self):
+        """Kembalikan job `berjalan` milik pekerja yang mati ke antrian; kembalikan jumlahnya."""
+        batas = time.time() - self.batas_berjalan
+        with self._koneksi() as conn:
+            return conn.execute(
+                "UPDATE job SET status = 'menunggu', jalan_setelah = ? WHERE status = 'berjalan' AND mulai < ?",
+                (time.time(), batas),
+            ).rowcount
+
+    def bersihkan(self, umur):
+        """Hapus job selesai yang lebih tua dari `umur` detik; job gagal disimpan untuk diperiksa."""
+        with self._koneksi() as conn:
+            return conn.execute("DELETE FROM job WHERE status = 'selesai' AND selesai < ?",
+                                (time.time() - umur,)).rowcount
+
+    def ulang_gagal(self):
+        with self._koneksi() as conn:
+            return conn.execute(
+                "UPDATE job SET status = 'menunggu', percobaan = 0, jalan_setelah = ? WHERE status = 'gagal'",
+                (time.time(),),
+            ).rowcount
+
+    # ----- observasi -----
+    def statistik(self):
+        """{'menunggu': n, 'berjalan': n, 'selesai': n, 'gagal': n, 'tertua_detik': umur job menunggu tertua}."""
+        with self._koneksi() as conn:
+            hasil = dict.fromkeys(STATUS, 0)
+            hasil.update(conn.execute('SELECT status, count(*) FROM job GROUP BY status').fetchall())
+            tertua = conn.execute(
+                "SELECT min(dibuat) FROM job WHERE status = 'menunggu' AND jalan_setelah <= ?", (time.time(),)
+            ).fetchone()[0]
+        hasil['tertua_detik'] = round(time.time() - tertua, 3) if tertua else 0
+        return hasil
+
+    def latensi(self, jendela=300):
+        """{nama: (jumlah, rata-rata detik menunggu, rata-rata detik berjalan)} job selesai dalam `jendela` detik."""
+        with self._koneksi() as conn:
+            baris = conn.execute(
+                "SELECT nama, count(*), avg(mulai - dibuat), avg(selesai - mulai) FROM job "
+                "WHERE status = 'selesai' AND selesai >= ? GROUP BY nama",
+                (time.time() - jendela,),
+            ).fetchall()
+        return {nama: (jumlah, tunggu, jalan) for nama, jumlah, tunggu, jalan in baris}
+
+    def daftar_gagal(self, batas=20):
+        with self._koneksi() as conn:
+            return conn.execute(
+                "SELECT id, nama, payload, percobaan, error FROM job WHERE status = 'gagal' "
+                "ORDER BY id DESC LIMIT ?", (batas,),
+            ).fetchall()
+
+    # ----- loop pekerja -----
+    def kerjakan(self, konteks=None, berhenti=None, interval=1.0, sekali=False, pekerja=None):
+        """Ambil dan jalankan job sampai `berhenti` di-set (atau antrian kosong jika `sekali`)."""
+        pekerja = pekerja or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        berhenti = berhenti or threading.Event()
+        jumlah = 0
+        terakhir_rawat = float('-inf')
+        while not berhenti.is_set():
+            if time.monotonic() - terakhir_rawat > 60:
+                terakhir_rawat = time.monotonic()
+                if self.pulihkan():
+                    self.log.warning('Job yang ditinggal pekerja lain dikembalikan ke antrian')
+                self.bersihkan(self.simpan)
+            job = self.ambil(pekerja)
+            if job is None:
+                if sekali:
+                    break
+                self._bangun.wait(interval)
+                self._bangun.clear()
+                continue
+            self.jalankan(job, konteks)
+            jumlah += 1
+        return jumlah
+
+    def pekerja_lokal(self, konteks, interval=1.0):
+        """Mode `thread`: siapkan pekerja di thread daemon proses ini; dimulai oleh mulai_pekerja_lokal()."""
+        self._konfig_lokal = {'konteks': konteks, 'interval': interval}
+
+    def mulai_pekerja_lokal(self):
+        """Mulai (atau hidupkan lagi) thread pekerja lokal; dipanggil proses web setelah fork."""
+        if self._konfig_lokal is None:
+            return
+        if self._thread_lokal is not None and self._thread_lokal.is_alive():
+            return
+        with self._kunci_lokal:
+            if self._thread_lokal is not None and self._thread_lokal.is_alive():
+                return
+            self._thread_lokal = threading.Thread(target=self.kerjakan, kwargs=self._konfig_lokal,
+                                                  name='antrian-job', daemon=True)
+            self._thread_lokal.start()
+
+
+class _Transaksi:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # IMMEDIATE: kunci tulis diambil di awal, jadi dua pekerja tidak bisa mengambil job yang sama
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, jenis, nilai, tb):
+        self.conn.execute('COMMIT' if jenis is None else 'ROLLBACK')
@@ -1,26 +1,184 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, make_response, abort, g
+from flask import send_from_directory
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
+from werkzeug.security import generate_password_hash
+from sqlalchemy import bindparam, delete, event, false, func, insert, inspect, or_, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.orm import load_only, undefer
+from datetime import datetime, timezone
+from contextlib import contextmanager
+from functools import wraps
+import click
+import hashlib
+import mimetypes
 import os
+import re
+import signal
+import sys
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa kunci file, init_db cukup aman untuk satu proses dev
+    fcntl = None
+
+import antrian
+import arsip
+import aset
+import basisdata
+import berkas
+import cache
+import ekspor
+import gambar as pengolah_gambar
+import instrumentasi as instr
+import kompresi
+import otentikasi
+import pencarian
+import penyimpanan
+import sindikasi
+import teks
 
 # -----------------------------------
 # KONFIGURASI APLIKASI
 # -----------------------------------
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'portal-berita-super-secret'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///berita.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = basisdata.normalisasi_url(os.environ.get('DATABASE_URL', 'sqlite:///berita.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = os.path.join('static', 'uploads')
+# Profil engine: `produksi` (WAL, pragma & pool yang disetel) atau `bawaan` (default SQLAlchemy/SQLite)
+app.config['SQLITE_PROFIL'] = os.environ.get('SQLITE_PROFIL', 'produksi')
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+app.config['SQLITE_CACHE_MB'] = int(os.environ.get('SQLITE_CACHE_MB', 64))
+app.config['SQLITE_MMAP_MB'] = int(os.environ.get('SQLITE_MMAP_MB', 256))
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_POOL_OVERFLOW'] = int(os.environ.get('DB_POOL_OVERFLOW', 10))
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = basisdata.opsi_engine(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+# Replika baca opsional (dipisah koma); tulis selalu ke DATABASE_URL
+app.config['SQLALCHEMY_BINDS'] = basisdata.binds_replika(os.environ.get('DATABASE_REPLICA_URLS', ''), app.config)
+# Setelah menulis, bacaan klien itu dilayani primary selama sekian detik (read-your-writes)
+app.config['DB_REPLIKA_LENGKET'] = float(os.environ.get('DB_REPLIKA_LENGKET', 5))
+app.config['UPLOAD_FOLDER'] = os.path.join(app.static_folder, 'uploads')
+app.config['BERITA_PER_HALAMAN'] = int(os.environ.get('BERITA_PER_HALAMAN', 12))
+app.config['ADMIN_PER_HALAMAN'] = int(os.environ.get('ADMIN_PER_HALAMAN', 50))
+# Batas ukuran satu file gambar; request lebih besar dari ini ditolak Werkzeug sebelum dibaca
+app.config['UPLOAD_MAKS_MB'] = int(os.environ.get('UPLOAD_MAKS_MB', 10))
+app.config['MAX_CONTENT_LENGTH'] = (app.config['UPLOAD_MAKS_MB'] + 1) * 1024 * 1024
+app.config['UNGGAH_SESI_DIR'] = os.environ.get('UNGGAH_SESI_DIR', os.path.join(app.instance_path, 'unggah'))
+app.config['UNGGAH_SESI_UMUR'] = int(os.environ.get('UNGGAH_SESI_UMUR', 24 * 3600))
+# Cache halaman: memory | filesystem | none
+app.config['PAGE_CACHE'] = os.environ.get('PAGE_CACHE', 'memory')
+app.config['PAGE_CACHE_TTL'] = int(os.environ.get('PAGE_CACHE_TTL', 300))
+app.config['PAGE_CACHE_MAKS'] = int(os.environ.get('PAGE_CACHE_MAKS', 512))
+app.config['PAGE_CACHE_DIR'] = os.environ.get('PAGE_CACHE_DIR', os.path.join(app.instance_path, 'cache'))
+# Pakai nama aset ber-hash dari `flask bangun-aset` jika manifest-nya ada
+app.config['ASET_FINGERPRINT'] = os.environ.get('ASET_FINGERPRINT', '1') == '1'
+# Kompresi response teks (br/zstd jika modulnya terpasang, selalu gzip)
+app.config['KOMPRESI'] = os.environ.get('KOMPRESI', '1') == '1'
+app.config['KOMPRESI_MIN_BYTE'] = int(os.environ.get('KOMPRESI_MIN_BYTE', 1024))
+app.config['KOMPRESI_LEVEL_GZIP'] = int(os.environ.get('KOMPRESI_LEVEL_GZIP', 6))
+# Snapshot HTML statis halaman publik; EKSPOR_OTOMATIS=1 memperbaruinya setiap ada perubahan berita
+app.config['EKSPOR_DIR'] = os.environ.get('EKSPOR_DIR', os.path.join(app.instance_path, 'ekspor'))
+app.config['EKSPOR_OTOMATIS'] = os.environ.get('EKSPOR_OTOMATIS', '0') == '1'
+# Feed Atom & sitemap XML: URL absolut memakai SITUS_URL karena dibangun di luar request
+app.config['SITUS_URL'] = os.environ.get('SITUS_URL', 'http://localhost:5000')
+app.config['SITUS_JUDUL'] = os.environ.get('SITUS_JUDUL', 'Portal Berita')
+app.config['SINDIKASI_DIR'] = os.environ.get('SINDIKASI_DIR', os.path.join(app.instance_path, 'sindikasi'))
+app.config['FEED_JUMLAH'] = int(os.environ.get('FEED_JUMLAH', 50))
+app.config['SINDIKASI_MAX_AGE'] = int(os.environ.get('SINDIKASI_MAX_AGE', 300))
+# Cache identitas user untuk load_user(): memory | filesystem (dipakai bersama antar worker) | none
+app.config['USER_CACHE'] = os.environ.get('USER_CACHE', 'memory')
+app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 60))
+app.config['USER_CACHE_MAKS'] = int(os.environ.get('USER_CACHE_MAKS', 1024))
+app.config['USER_CACHE_DIR'] = os.environ.get('USER_CACHE_DIR', os.path.join(app.instance_path, 'cache-user'))
+# Instrumentasi opt-in: header Server-Timing, endpoint /metrics, dan profil cProfile request lambat
+app.config['INSTRUMENTASI'] = os.environ.get('INSTRUMENTASI', '0') == '1'
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+app.config['PROFIL_SAMPEL'] = float(os.environ.get('PROFIL_SAMPEL', 0))
+app.config['PROFIL_AMBANG_MS'] = float(os.environ.get('PROFIL_AMBANG_MS', 500))
+app.config['PROFIL_DIR'] = os.environ.get('PROFIL_DIR', os.path.join(app.instance_path, 'profil'))
+# Mode pengembangan: hitung query per request, peringatkan query duplikat / N+1 / anggaran terlampaui
+app.config['DETEKSI_QUERY'] = os.environ.get('DETEKSI_QUERY', '0') == '1'
+app.config['DETEKSI_QUERY_AMBANG'] = int(os.environ.get('DETEKSI_QUERY_AMBANG', 5))
+app.config['DETEKSI_QUERY_KETAT'] = os.environ.get('DETEKSI_QUERY_KETAT', '0') == '1'
+# Hash password dijalankan di pool terbatas; hash lama dengan metode lain di-hash ulang saat login
+app.config['HASH_METODE'] = os.environ.get('HASH_METODE', 'pbkdf2:sha256')
+app.config['HASH_WORKER'] = int(os.environ.get('HASH_WORKER', 2))
+app.config['HASH_ANTRIAN'] = int(os.environ.get('HASH_ANTRIAN', 16))
+# Batas percobaan "jumlah/detik" per IP dan per username
+app.config['LOGIN_BATAS_IP'] = otentikasi.urai_batas(os.environ.get('LOGIN_BATAS_IP', '20/60'))
+app.config['LOGIN_BATAS_USER'] = otentikasi.urai_batas(os.environ.get('LOGIN_BATAS_USER', '5/60'))
+app.config['REGISTER_BATAS_IP'] = otentikasi.urai_batas(os.environ.get('REGISTER_BATAS_IP', '5/3600'))
+# Jumlah reverse proxy tepercaya di depan aplikasi; IP klien (pembatas laju) dibaca dari X-Forwarded-For
+app.config['PROXY_HOP'] = int(os.environ.get('PROXY_HOP', 0))
+# Antrian job latar belakang: `thread` (pekerja di setiap proses web) atau `pekerja` (`flask worker` terpisah)
+app.config['ANTRIAN_DB'] = os.environ.get('ANTRIAN_DB', os.path.join(app.instance_path, 'antrian.db'))
+app.config['ANTRIAN_MODE'] = os.environ.get('ANTRIAN_MODE', 'thread')
+app.config['ANTRIAN_MAKS_PERCOBAAN'] = int(os.environ.get('ANTRIAN_MAKS_PERCOBAAN', 5))
+app.config['ANTRIAN_SIMPAN_JAM'] = float(os.environ.get('ANTRIAN_SIMPAN_JAM', 24))
+# Buat skema & akun admin sekali saat aplikasi dimuat (set 0 jika memakai `flask init-db`)
+app.config['AUTO_INIT_DB'] = os.environ.get('AUTO_INIT_DB', '1') == '1'
+
+if app.config['PROXY_HOP']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_HOP'], x_proto=app.config['PROXY_HOP'])
 
 # Pastikan folder upload ada
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': basisdata.SesiRute})
+with app.app_context():
+    for engine in db.engines.values():
+        basisdata.pasang_pragma(engine, basisdata.pragma_sqlite(app.config))
+rute_replika = basisdata.RuteReplika(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+instrumentasi = instr.Instrumentasi(app)
+kompresi_response = kompresi.Kompresi(app)
+pool_hash = otentikasi.PoolHash(app.config['HASH_METODE'], app.config['HASH_WORKER'], app.config['HASH_ANTRIAN'])
+pembatas = otentikasi.PembatasLaju()
+deteksi_query = instr.DeteksiQuery(app)
+
+page_cache = cache.buat_cache(
+    app.config['PAGE_CACHE'],
+    maks=app.config['PAGE_CACHE_MAKS'],
+    ttl=app.config['PAGE_CACHE_TTL'],
+    folder=app.config['PAGE_CACHE_DIR'],
+    # Backend memory: invalidasi diteruskan ke worker lain lewat cap generasi di folder ini
+    folder_generasi=os.path.join(app.config['PAGE_CACHE_DIR'], 'generasi'),
+)
+manifest_aset = aset.muat_manifest(app.static_folder) if app.config['ASET_FINGERPRINT'] else {}
+
+user_cache = cache.buat_cache(
+    app.config['USER_CACHE'],
+    maks=app.config['USER_CACHE_MAKS'],
+    ttl=app.config['USER_CACHE_TTL'],
+    folder=app.config['USER_CACHE_DIR'],
+    # Pencabutan is_admin / hapus user di satu worker langsung berlaku di worker lain
+    folder_generasi=os.path.join(app.config['USER_CACHE_DIR'], 'generasi'),
+)
+
+antrian_job = antrian.Antrian(
+    app.config['ANTRIAN_DB'],
+    maks_percobaan=app.config['ANTRIAN_MAKS_PERCOBAAN'],
+    simpan=app.config['ANTRIAN_SIMPAN_JAM'] * 3600,
+    log=app.logger,
+)
+if app.config['ANTRIAN_MODE'] == 'thread':
+    antrian_job.pekerja_lokal(app.app_context)
+
+    @app.before_request
+    def mulai_pekerja_antrian():
+        # Hanya proses yang melayani request (setelah fork) yang menjalankan thread pekerja;
+        # job yang tertinggal dari CLI atau restart ikut dikerjakan. Di gunicorn thread sudah
+        # dimulai lebih awal oleh hook post_worker_init.
+        antrian_job.mulai_pekerja_lokal()
+
 # -----------------------------------
 # MODEL DATABASE
 # -----------------------------------
@@ -31,12 +189,37 @@ class User(db.Model, UserMixin):
     is_admin = db.Column(db.Boolean, default=False)
 
 
+def _sekarang():
+    # Disimpan sebagai waktu UTC tanpa zona waktu
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Berita(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     judul = db.Column(db.String(200), nullable=False)
-    isi = db.Column(db.Text, nullable=False)
-    gambar = db.Column(db.String(200), nullable=True)
-    penulis = db.Column(db.String(100), nullable=False)
+    # Isi artikel hanya dimuat jika diminta (undefer) atau diakses; daftar memakai ringkasan
+    isi = db.deferred(db.Column(db.Text, nullable=False))
+    ringkasan = db.Column(db.String(300), nullable=True)
+    jumlah_kata = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    waktu_baca = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    gambar = db.Column(db.String(200), nullable=True, index=True)
+    penulis = db.Column(db.String(100), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=_sekarang)
+    diperbarui = db.Column(db.DateTime, nullable=False, default=_sekarang, onupdate=_sekarang, index=True)
+    versi = db.Column(db.Integer, nullable=False, default=1)
+    # Berita yang disembunyikan tetap tersimpan tapi tidak tampil di halaman publik
+    terbit = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+
+    # versi naik otomatis setiap kali baris di-UPDATE lewat ORM
+    __mapper_args__ = {'version_id_col': versi}
+    # Urutan "terbaru" beranda: keyset (created_at, id) memakai indeks ini
+    __table_args__ = (db.Index('ix_berita_created_at_id', 'created_at', 'id'),)
+
+
+# Kartu berita hanya butuh kolom ringkas; isi tidak ikut di-load
+KOLOM_KARTU = load_only(Berita.id, Berita.judul, Berita.gambar, Berita.penulis, Berita.ringkasan, Berita.waktu_baca)
+# Tabel admin hanya butuh kolom ringkas; isi artikel tidak pernah dibaca
+KOLOM_ADMIN = (Berita.id, Berita.judul, Berita.penulis, Berita.created_at, Berita.terbit)
 
 
 # -----------------------------------
@@ -44,327 +227,522 @@ class Berita(db.Model):
 # -----------------------------------
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Setiap request user yang login memanggil ini; simpan identitasnya supaya tidak query ulang
+    identitas = user_cache.get(f'user:{user_id}', 'identitas')
+    if identitas is None:
+        # Dicatat sebelum membaca: baris yang dibaca sebelum invalidasi tidak masuk cache
+        sejak = cache.penanda()
+        user = db.session.get(User, int(user_id))
+        if user is None:
+            return None
+        identitas = otentikasi.IdentitasUser.dari(user)
+        user_cache.set(f'user:{user_id}', 'identitas', identitas, sejak=sejak)
+    return identitas
 
 
-# -----------------------------------
-# ROUTES UTAMA
-# -----------------------------------
-@app.route('/')
-def index():
-    q = request.args.get('q', '')
-    if q:
-        berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all()
-    else:
-        berita = Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
+@event.listens_for(basisdata.SesiRute, 'after_flush')
+def catat_user_berubah(sesi, flush_context):
+    # Hanya perubahan lewat ORM yang terdeteksi; UPDATE massal harus menghapus cache sendiri
+    berubah = sesi.info.setdefault('user_berubah', set())
+    berubah.update(obj.id for obj in list(sesi.dirty) + list(sesi.deleted) if isinstance(obj, User))
 
 
-@app.route('/berita/<int:id>')
-def detail(id):
-    b = Berita.query.get_or_404(id)
-    return render_template('detail.html', berita=b)
+@event.listens_for(basisdata.SesiRute, 'after_commit')
+def invalidasi_user(sesi):
+    # Setelah commit, bukan saat flush: sebelum commit worker lain masih membaca baris lama
+    # dan bisa menyimpannya lagi ke cache setelah cap generasi
+    for id in sesi.info.pop('user_berubah', ()):
+        user_cache.hapus(f'user:{id}')
 
 
-# -----------------------------------
-# LOGIN & REGISTER
-# -----------------------------------
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
-            login_user(user)
-            flash('Login berhasil!', 'success')
-            return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
-        else:
-            flash('Username atau password salah!', 'danger')
-    return render_template('login.html')
+@event.listens_for(basisdata.SesiRute, 'after_soft_rollback')
+def batalkan_user_berubah(sesi, transaksi):
+    sesi.info.pop('user_berubah', None)
+
+
+# -----------------------------------
+# CACHE HALAMAN & CONDITIONAL GET
+# -----------------------------------
+def _sidik_template():
+    # ETag harus berubah jika template berubah walau datanya sama
+    folder = os.path.join(app.root_path, app.template_folder)
+    h = hashlib.sha1()
+    for nama in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, nama), 'rb') as f:
+            h.update(f.read())
+    # URL aset ber-hash ikut tertulis di halaman
+    h.update(repr(sorted(manifest_aset.items())).encode('utf-8'))
+    return h.hexdigest()
+
+
+SIDIK_TEMPLATE = _sidik_template()
+
+
+# Hanya argumen yang dibaca view yang membedakan halaman; parameter lain (utm_*, fbclid,
+# ...) tidak boleh memecah cache. Nilai dinormalisasi dengan tipe yang sama seperti di view.
+ARGUMEN_CACHE = (('q', str), ('after', int), ('hal', int))
+
+
+def _kunci_cache():
+    # Halaman berbeda untuk tamu dan tiap user (navbar), jadi status login ikut jadi kunci
+    args = '&'.join(f'{k}={v}' for k, tipe in ARGUMEN_CACHE
+                    if (v := request.args.get(k, type=tipe)) not in (None, ''))
+    return f'{request.path}?{args}|{current_user.get_id() or "anon"}'
+
+
+def _buat_etag(basis, kunci):
+    return hashlib.sha1(f'{basis}|{kunci}|{SIDIK_TEMPLATE}'.encode('utf-8')).hexdigest()[:24]
+
+
+def _tidak_berubah(etag, diubah):
+    if request.if_none_match:
+        # Perbandingan lemah: response terkompres membawa ETag W/"..." (lihat kompresi.py)
+        return request.if_none_match.contains_weak(etag)
+    if diubah is not None and request.if_modified_since:
+        return diubah.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _validator_index():
+    # Berubah setiap ada berita ditambah, dihapus, atau diubah. Subquery terpisah
+    # supaya max() bisa langsung membaca ujung indeks tanpa scan tabel.
+    jumlah, id_maks, diperbarui = db.session.execute(select(
+        select(func.count()).select_from(Berita).scalar_subquery(),
+        select(func.max(Berita.id)).scalar_subquery(),
+        select(func.max(Berita.diperbarui)).scalar_subquery(),
+    )).one()
+    return f'{jumlah}.{id_maks}.{diperbarui}', None
+
+
+def _validator_berita(id):
+    row = db.session.query(Berita.versi, Berita.diperbarui).filter_by(id=id, terbit=True).first()
+    if row is None:
+        abort(404)
+    return f'{id}.{row.versi}', row.diperbarui.replace(tzinfo=timezone.utc)
+
+
+def _sambungkan_varian(resp, ns, kunci, entri):
+    # Middleware kompresi memakai ulang body terkompresi yang tersimpan di entri cache
+    resp.varian_kompresi = entri.setdefault('kompres', {})
+
+    def simpan(enkoding, data):
+        entri['kompres'][enkoding] = data
+        page_cache.set(ns, kunci, entri, sejak=entri.get('sejak'))
+    resp.simpan_varian = simpan
+
+
+def cache_halaman(namespace, validator):
+    def dekorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            # Pesan flash yang menunggu harus ikut dirender, jangan layani dari cache
+            if session.get('_flashes') or request.environ.get(cache.LEWATI_CACHE):
+                return view(**kwargs)
+
+            ns = namespace.format(**kwargs)
+            kunci = _kunci_cache()
+            entri = page_cache.get(ns, kunci)
+            if entri is not None:
+                x_cache = 'HIT'
+                etag, diubah = entri['etag'], entri['diubah']
+            else:
+                x_cache = 'MISS'
+                # Dicatat sebelum membaca database: jika invalidasi terjadi selama render,
+                # entri ini dianggap basi walaupun set() baru dipanggil sesudahnya
+                sejak = cache.penanda()
+                basis, diubah = validator(**kwargs)
+                etag = _buat_etag(basis, kunci)
+
+            # Klien sudah punya versi terbaru: jawab 304 tanpa merender template
+            if _tidak_berubah(etag, diubah):
+                resp = app.response_class(status=304)
+                # Untuk kompresi.py: 304 mewakili body HTML ini (ukurannya belum diketahui jika MISS)
+                resp.ukuran_body = len(entri['body']) if entri is not None else None
+            elif entri is not None:
+                resp = app.response_class(entri['body'], mimetype='text/html')
+                _sambungkan_varian(resp, ns, kunci, entri)
+            else:
+                resp = make_response(view(**kwargs))
+                if resp.status_code != 200:
+                    return resp
+                # Halaman dari replika tidak disimpan: replika bisa tertinggal berapa lama pun
+                # (tulis dari worker lain, job, CLI), dan tidak ada invalidasi saat ia menyusul
+                if not g.get('_db_replika'):
+                    entri = {'body': resp.get_data(), 'etag': etag, 'diubah': diubah, 'kompres': {},
+                             'sejak': sejak}
+                    page_cache.set(ns, kunci, entri, sejak=sejak)
+                    _sambungkan_varian(resp, ns, kunci, entri)
+
+            resp.set_etag(etag)
+            if diubah is not None:
+                resp.last_modified = diubah
+            resp.headers['Cache-Control'] = 'private, no-cache' if current_user.is_authenticated else 'public, no-cache'
+            resp.vary.add('Cookie')
+            resp.headers['X-Cache'] = x_cache
+            return resp
+        return wrapper
+    return dekorator
+
+
+def invalidasi_cache(*ids):
+    page_cache.hapus('index')
+    for id in ids:
+        page_cache.hapus(f'berita:{id}')
+    if app.config['EKSPOR_OTOMATIS']:
+        jadwalkan_ekspor(*ids)
+
+
+# -----------------------------------
+# GAMBAR UPLOAD
+# -----------------------------------
+# Resize & kompresi ulang berjalan sebagai job antrian supaya tambah() tetap cepat;
+# kegagalan dicoba ulang oleh pekerja
+@antrian_job.tugas('gambar.varian')
+def _proses_gambar(id, nama):
+    pengolah_gambar.buat_varian(app.config['UPLOAD_FOLDER'], nama)
+    # HTML berubah (srcset baru), jadi validator juga harus berubah: naikkan versi & diperbarui
+    # setiap berita yang memakai file ini (upload berbasis hash bisa dipakai bersama).
+    # UPDATE massal melewati version_id_col ORM, jadi versi dinaikkan sendiri.
+    ids = db.session.scalars(select(Berita.id).where(Berita.gambar == nama)).all()
+    if ids:
+        db.session.execute(update(Berita).where(Berita.id.in_(ids))
+                           .values(versi=Berita.versi + 1, diperbarui=_sekarang()))
+        db.session.commit()
+    invalidasi_cache(*(set(ids) | {id}))
+
 
+def hapus_gambar_yatim(*nama_nama):
+    # Berita.gambar adalah satu-satunya referensi ke file upload
+    folder = app.config['UPLOAD_FOLDER']
+    for i in range(0, len(nama_nama), 500):
+        potongan = set(nama_nama[i:i + 500])
+        masih_dipakai = set(db.session.scalars(select(Berita.gambar).where(Berita.gambar.in_(potongan))))
+        for nama in potongan - masih_dipakai:
+            penyimpanan.hapus(folder, nama)
+            pengolah_gambar.hapus_varian(folder, nama)
+            penyimpanan.rapikan_folder(folder, nama)
 
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
 
-        if User.query.filter_by(username=username).first():
-            flash('Username sudah digunakan!', 'warning')
-            return redirect(url_for('register'))
+@antrian_job.tugas('gambar.bersihkan')
+def _bersihkan_gambar(nama):
+    hapus_gambar_yatim(*nama)
 
-        user = User(
-            username=username,
-            password=generate_password_hash(password, method='pbkdf2:sha256')
-        )
-        db.session.add(user)
-        db.session.commit()
-        flash('Akun berhasil dibuat! Silakan login.', 'success')
-        return redirect(url_for('login'))
 
-    return render_template('register.html')
+@app.after_request
+def cache_aset_immutable(resp):
+    # Nama file upload dan aset dist berbasis hash isi, jadi URL-nya tidak pernah berubah isi
+    if request.endpoint == 'static' and resp.status_code in (200, 304):
+        filename = (request.view_args or {}).get('filename', '')
+        if filename.startswith('uploads/') and penyimpanan.immutable(filename[len('uploads/'):]):
+            resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        elif filename.startswith(aset.FOLDER_DIST + '/'):
+            resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+            resp.vary.add('Accept-Encoding')
+    return resp
 
 
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Kamu telah logout.', 'info')
-    return redirect(url_for('index'))
+@app.template_global()
+def varian_gambar(nama):
+    return pengolah_gambar.srcset(
+        app.config['UPLOAD_FOLDER'], nama,
+        lambda f: url_for('static', filename='uploads/' + f),
+    )
 
 
 # -----------------------------------
-# ADMIN DASHBOARD
+# ASET STATIS
 # -----------------------------------
-@app.route('/admin')
-@login_required
-def admin_index():
-    if not current_user.is_admin:
-        flash('Akses ditolak! Hanya admin yang boleh masuk.', 'danger')
-        return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
-
-
-@app.route('/admin/tambah', methods=['GET', 'POST'])
-@login_required
-def tambah():
-    if not current_user.is_admin:
-        flash('Hanya admin yang bisa menambah berita.', 'danger')
-        return redirect(url_for('index'))
-
-    if request.method == 'POST':
-        judul = request.form['judul']
-        isi = request.form['isi']
-        gambar = None
-
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
-
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
-        db.session.add(berita)
-        db.session.commit()
-        flash('Berita berhasil ditambahkan!', 'success')
-        return redirect(url_for('admin_index'))
-
-    return render_template('admin_form.html')
-
-
-@app.route('/admin/hapus/<int:id>')
-@login_required
-def hapus(id):
-    if not current_user.is_admin:
-        flash('Akses ditolak!', 'danger')
-        return redirect(url_for('index'))
-
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
-    flash('Berita berhasil dihapus.', 'info')
-    return redirect(url_for('admin_index'))
+@app.url_defaults
+def url_aset(endpoint, values):
+    # url_for('static', filename='style.css') -> /static/dist/style.<hash>.css
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = manifest_aset.get(values['filename'], values['filename'])
 
 
-# -----------------------------------
-# INISIALISASI DATABASE OTOMATIS
-# -----------------------------------
 @app.before_request
-def init_db():
-    db.create_all()
-    if not User.query.filter_by(username='admin').first():
-        admin = User(
-            username='admin',
-            password=generate_password_hash('admin', method='pbkdf2:sha256'),
-            is_admin=True
-        )
-        db.session.add(admin)
-        db.session.commit()
+def aset_terkompres():
+    # Layani varian .br/.gz hasil build langsung, tanpa kompresi saat request
+    if request.endpoint != 'static':
+        return None
+    filename = request.view_args.get('filename', '')
+    if not filename.startswith(aset.FOLDER_DIST + '/'):
+        return None
+    pilihan = aset.varian_terkompres(app.static_folder, filename, request.accept_encodings)
+    if pilihan is None:
+        return None
+    nama, enkoding = pilihan
+    resp = send_from_directory(app.static_folder, nama, mimetype=mimetypes.guess_type(filename)[0])
+    resp.headers['Content-Encoding'] = enkoding
+    return resp
 
 
 # -----------------------------------
-# MENJALANKAN APLIKASI
+# EKSPOR STATIS
 # -----------------------------------
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)    gambar = db.Column(db.String(200), nullable=True)
-    penulis = db.Column(db.String(100), nullable=False)
+def _urutan_ekspor():
+    return db.session.scalars(select(Berita.id).where(Berita.terbit)
+                              .order_by(Berita.created_at, Berita.id)).all()
 
-# -----------------------------------
-# LOGIN MANAGEMENT
-# -----------------------------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
 
-# -----------------------------------
-# ROUTES UTAMA
-# -----------------------------------
-@app.route('/')
-def index():
-    q = request.args.get('q', '')
-    berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all() if q else Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
+pengekspor = ekspor.Pengekspor(app, app.config['EKSPOR_DIR'], _urutan_ekspor)
 
-@app.route('/berita/<int:id>')
-def detail(id):
-    b = Berita.query.get_or_404(id)
-    return render_template('detail.html', berita=b)
 
-# -----------------------------------
-# LOGIN & REGISTER
-# -----------------------------------
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
-            login_user(user)
-            flash('Login berhasil!', 'success')
-            return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
-        flash('Username atau password salah!', 'danger')
-    return render_template('login.html')
+def jadwalkan_ekspor(*ids):
+    # Perubahan beruntun digabung: selama job dengan kunci yang sama masih menunggu, tidak dibuat lagi
+    antrian_job.kirim_banyak(
+        [('ekspor.daftar', None, 'ekspor.daftar')]
+        + [('ekspor.berita', {'id': id}, f'ekspor.berita:{id}') for id in ids]
+    )
 
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
 
-        if User.query.filter_by(username=username).first():
-            flash('Username sudah digunakan!', 'warning')
-            return redirect(url_for('register'))
+@antrian_job.tugas('ekspor.daftar')
+def _ekspor_daftar():
+    pengekspor.static()
+    pengekspor.daftar()
 
-        user = User(username=username, password=generate_password_hash(password, method='sha256'))
-        db.session.add(user)
-        db.session.commit()
-        flash('Akun berhasil dibuat! Silakan login.', 'success')
-        return redirect(url_for('login'))
-    return render_template('register.html')
 
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Kamu telah logout.', 'info')
-    return redirect(url_for('index'))
+@antrian_job.tugas('ekspor.berita')
+def _ekspor_berita(id):
+    pengekspor.berita(id)
+    pengekspor.halaman_berisi(id)
+
 
 # -----------------------------------
-# ADMIN DASHBOARD
+# FEED & SITEMAP
 # -----------------------------------
-@app.route('/admin')
-@login_required
-def admin_index():
-    if not current_user.is_admin:
-        flash('Akses ditolak! Hanya admin yang boleh masuk.', 'danger')
-        return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
+_kunci_sindikasi = threading.Lock()
 
-@app.route('/admin/tambah', methods=['GET', 'POST'])
-@login_required
-def tambah():
-    if not current_user.is_admin:
-        flash('Hanya admin yang bisa menambah berita.', 'danger')
-        return redirect(url_for('index'))
 
-    if request.method == 'POST':
-        judul = request.form['judul']
-        isi = request.form['isi']
-        gambar = None
+def _konteks_situs():
+    # url_for(_external=True) di job/CLI menghasilkan URL publik situs
+    return app.test_request_context(base_url=app.config['SITUS_URL'])
 
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file and file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
 
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
-        db.session.add(berita)
-        db.session.commit()
-        flash('Berita berhasil ditambahkan!', 'success')
-        return redirect(url_for('admin_index'))
+def _jumlah_shard():
+    id_maks = db.session.scalar(select(func.max(Berita.id))) or 1
+    return sindikasi.shard(id_maks) + 1
 
-    return render_template('admin_form.html')
 
-@app.route('/admin/hapus/<int:id>')
-@login_required
-def hapus(id):
-    if not current_user.is_admin:
-        flash('Akses ditolak!', 'danger')
-        return redirect(url_for('index'))
+def jadwalkan_sindikasi(*ids, semua=False):
+    # Hanya berita yang terbit/hilang yang mengubah feed & sitemap; shard dihitung dari id.
+    # `semua` (mis. setelah impor) membangun ulang setiap shard.
+    if semua:
+        nomor = range(_jumlah_shard())
+    elif ids:
+        nomor = {sindikasi.shard(id) for id in ids}
+    else:
+        return
+    antrian_job.kirim_banyak(
+        [('sindikasi.feed', None, 'sindikasi.feed')]
+        + [('sindikasi.sitemap', {'nomor': n}, f'sindikasi.sitemap:{n}') for n in sorted(nomor)]
+    )
+
+
+@antrian_job.tugas('sindikasi.feed')
+def bangun_feed():
+    berita = db.session.execute(
+        select(Berita.id, Berita.judul, Berita.penulis, Berita.ringkasan, Berita.created_at, Berita.diperbarui)
+        .where(Berita.terbit).order_by(Berita.created_at.desc(), Berita.id.desc())
+        .limit(app.config['FEED_JUMLAH'])
+    ).all()
+    with _konteks_situs():
+        entri = [{
+            'judul': b.judul,
+            'url': url_for('detail', id=b.id, _external=True),
+            'penulis': b.penulis,
+            'ringkasan': b.ringkasan,
+            'dibuat': b.created_at,
+            'diperbarui': b.diperbarui,
+        } for b in berita]
+        data = sindikasi.atom(app.config['SITUS_JUDUL'], url_for('index', _external=True),
+                              url_for('feed', _external=True), entri)
+    sindikasi.tulis(app.config['SINDIKASI_DIR'], sindikasi.NAMA_FEED, data)
+
+
+def _bangun_shard(nomor):
+    awal, akhir = sindikasi.rentang_shard(nomor)
+    rows = db.session.execute(
+        select(Berita.id, Berita.diperbarui)
+        .where(Berita.terbit, Berita.id.between(awal, akhir)).order_by(Berita.id)
+    ).all()
+    with _konteks_situs():
+        url = [(url_for('index', _external=True), None)] if nomor == 0 else []
+        url += [(url_for('detail', id=id, _external=True), diperbarui) for id, diperbarui in rows]
+    sindikasi.tulis(app.config['SINDIKASI_DIR'], sindikasi.nama_shard(nomor), sindikasi.urlset(url))
+
+
+@antrian_job.tugas('sindikasi.sitemap')
+def bangun_sitemap(nomor=None):
+    """Bangun ulang shard `nomor` (atau semua shard), lalu /sitemap.xml."""
+    folder = app.config['SINDIKASI_DIR']
+    jumlah = _jumlah_shard()
+    for n in range(jumlah):
+        if n == nomor or nomor is None or not os.path.exists(os.path.join(folder, sindikasi.nama_shard(n))):
+            _bangun_shard(n)
+    # Shard di atas id terbesar tersisa setelah berita terakhir dihapus
+    n = jumlah
+    while os.path.exists(os.path.join(folder, sindikasi.nama_shard(n))):
+        sindikasi.hapus(folder, sindikasi.nama_shard(n))
+        n += 1
+
+    if jumlah == 1:
+        with open(os.path.join(folder, sindikasi.nama_shard(0)), 'rb') as f:
+            data = f.read()
+    else:
+        with _konteks_situs():
+            # File shard hanya ditulis ulang jika isinya berubah, jadi mtime-nya adalah lastmod
+            data = sindikasi.indeks_sitemap([
+                (url_for('sitemap_shard', nomor=n, _external=True),
+                 datetime.fromtimestamp(os.path.getmtime(os.path.join(folder, sindikasi.nama_shard(n))),
+                                        timezone.utc).replace(tzinfo=None))
+                for n in range(jumlah)
+            ])
+    sindikasi.tulis(folder, sindikasi.NAMA_SITEMAP, data)
+
+
+def _layani_sindikasi(nama, mimetype, bangun):
+    folder = app.config['SINDIKASI_DIR']
+    if not os.path.exists(os.path.join(folder, nama)):
+        # Pertama kali setelah deploy, sebelum ada job yang membangunnya
+        with _kunci_sindikasi:
+            if not os.path.exists(os.path.join(folder, nama)):
+                bangun()
+    # ETag & Last-Modified dari file; If-None-Match dijawab 304 oleh send_from_directory
+    max_age = app.config['SINDIKASI_MAX_AGE']
+    pilihan = aset.varian_terkompres(folder, nama, request.accept_encodings)
+    if pilihan is None:
+        resp = send_from_directory(folder, nama, mimetype=mimetype, max_age=max_age)
+    else:
+        resp = send_from_directory(folder, pilihan[0], mimetype=mimetype, max_age=max_age)
+        resp.headers['Content-Encoding'] = pilihan[1]
+    resp.vary.add('Accept-Encoding')
+    resp.cache_control.public = True
+    return resp
 
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
-    flash('Berita berhasil dihapus.', 'info')
-    return redirect(url_for('admin_index'))
 
-# -----------------------------------
-# INISIALISASI DATABASE
-# -----------------------------------
-@app.before_first_request
-def init_db():
-    db.create_all()
-    if not User.query.filter_by(username='admin').first():
-        admin = User(username='admin', password=generate_password_hash('admin', method='sha256'), is_admin=True)
-        db.session.add(admin)
-        db.session.commit()
+@app.route('/feed.xml')
+def feed():
+    return _layani_sindikasi(sindikasi.NAMA_FEED, 'application/atom+xml', bangun_feed)
 
-# -----------------------------------
-# ENTRY POINT UNTUK SERVER PRODUKSI
-# -----------------------------------
-def create_app():
-    return app
 
-# -----------------------------------
-# MENJALANKAN APLIKASI SECARA LOKAL
-# -----------------------------------
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port)    judul = db.Column(db.String(200), nullable=False)
-    isi = db.Column(db.Text, nullable=False)
-    gambar = db.Column(db.String(200), nullable=True)
-    penulis = db.Column(db.String(100), nullable=False)
+@app.route('/sitemap.xml')
+def sitemap():
+    return _layani_sindikasi(sindikasi.NAMA_SITEMAP, 'application/xml', bangun_sitemap)
 
 
-# -----------------------------------
-# LOGIN MANAGEMENT
-# -----------------------------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
+@app.route('/sitemap-<int:nomor>.xml')
+def sitemap_shard(nomor):
+    if nomor >= _jumlah_shard():
+        abort(404)
+    return _layani_sindikasi(sindikasi.nama_shard(nomor), 'application/xml', lambda: bangun_sitemap(nomor))
 
 
 # -----------------------------------
 # ROUTES UTAMA
 # -----------------------------------
 @app.route('/')
+@basisdata.baca_replika
+@instr.anggaran_query(4)
+@cache_halaman('index', _validator_index)
 def index():
     q = request.args.get('q', '')
+    # Ekspor statis merender index.html dengan jumlah berita sesuai batas halamannya
+    per_halaman = request.environ.get(ekspor.PER_HALAMAN) or app.config['BERITA_PER_HALAMAN']
     if q:
-        berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all()
+        return _hasil_pencarian(q, per_halaman)
+
+    after = request.args.get('after', type=int)
+    query = Berita.query.options(KOLOM_KARTU).filter(Berita.terbit)
+    if after:
+        # Kursor berbentuk id; posisinya dalam urutan (created_at, id) dicari lewat primary key.
+        # Jika berita kursor sudah dihapus, pakai tetangga terdekatnya.
+        kursor = (db.session.query(Berita.created_at, Berita.id)
+                  .filter(Berita.id <= after).order_by(Berita.id.desc()).first())
+        if kursor is None:
+            query = query.filter(false())
+        elif kursor.id == after:
+            query = query.filter(tuple_(Berita.created_at, Berita.id) < tuple_(kursor.created_at, kursor.id))
+        else:
+            query = query.filter(tuple_(Berita.created_at, Berita.id) <= tuple_(kursor.created_at, kursor.id))
+
+    # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+    berita = (query.order_by(Berita.created_at.desc(), Berita.id.desc())
+              .limit(per_halaman + 1).all())
+    berikutnya = None
+    if len(berita) > per_halaman:
+        berita = berita[:per_halaman]
+        berikutnya = {'after': berita[-1].id}
+    return render_template('index.html', berita=berita, q=q, lanjutan=bool(after), berikutnya=berikutnya)
+
+
+def _hasil_pencarian(q, per_halaman):
+    hal = max(request.args.get('hal', 1, type=int), 1)
+    offset = (hal - 1) * per_halaman
+
+    if pencarian.tersedia(db):
+        berita = pencarian.cari(db, q, offset, per_halaman + 1)
     else:
-        berita = Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
+        # Database tanpa FTS5: cari dengan LIKE di judul dan isi
+        berita = (Berita.query.options(KOLOM_KARTU).filter(Berita.terbit)
+                  .filter(or_(Berita.judul.like(f"%{q}%"), Berita.isi.like(f"%{q}%")))
+                  .order_by(Berita.created_at.desc(), Berita.id.desc())
+                  .offset(offset).limit(per_halaman + 1).all())
+
+    berikutnya = None
+    if len(berita) > per_halaman:
+        berita = berita[:per_halaman]
+        berikutnya = {'q': q, 'hal': hal + 1}
+    return render_template('index.html', berita=berita, q=q, lanjutan=hal > 1, berikutnya=berikutnya)
 
 
 @app.route('/berita/<int:id>')
+@basisdata.baca_replika
+@instr.anggaran_query(3)
+@cache_halaman('berita:{id}', _validator_berita)
 def detail(id):
-    b = Berita.query.get_or_404(id)
+    b = Berita.query.options(undefer(Berita.isi)).filter_by(id=id, terbit=True).first_or_404()
     return render_template('detail.html', berita=b)
 
 
 # -----------------------------------
 # LOGIN & REGISTER
 # -----------------------------------
+def _tolak(template, status, pesan, tunggu):
+    flash(pesan, 'danger')
+    resp = make_response(render_template(template), status)
+    resp.headers['Retry-After'] = str(tunggu)
+    return resp
+
+
+def _terlalu_sering(*aturan):
+    for kunci, batas in aturan:
+        tunggu = pembatas.cek(kunci, batas)
+        if tunggu:
+            return tunggu
+    return 0
+
+
 @app.route('/login', methods=['GET', 'POST'])
+@instr.anggaran_query(3)
 def login():
     if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
+        username = request.form['username']
+        tunggu = _terlalu_sering((f'login-ip:{request.remote_addr}', app.config['LOGIN_BATAS_IP']),
+                                 (f'login-user:{username}', app.config['LOGIN_BATAS_USER']))
+        if tunggu:
+            return _tolak('login.html', 429, f'Terlalu banyak percobaan login. Coba lagi dalam {tunggu} detik.', tunggu)
+
+        user = User.query.filter_by(username=username).first()
+        try:
+            with instrumentasi.ukur('hash'):
+                cocok = user is not None and pool_hash.cocok(user.password, request.form['password'])
+                if cocok and pool_hash.perlu_rehash(user.password):
+                    user.password = pool_hash.buat(request.form['password'])
+                    db.session.commit()
+        except otentikasi.AntrianPenuh:
+            return _tolak('login.html', 503, 'Server sedang sibuk, silakan coba lagi.', 1)
+        if cocok:
+            pembatas.reset(f'login-user:{username}')
             login_user(user)
             flash('Login berhasil!', 'success')
             return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
@@ -379,14 +757,20 @@ def register():
         username = request.form['username']
         password = request.form['password']
 
+        tunggu = _terlalu_sering((f'register-ip:{request.remote_addr}', app.config['REGISTER_BATAS_IP']))
+        if tunggu:
+            return _tolak('register.html', 429, f'Terlalu banyak pendaftaran. Coba lagi dalam {tunggu} detik.', tunggu)
+
         if User.query.filter_by(username=username).first():
             flash('Username sudah digunakan!', 'warning')
             return redirect(url_for('register'))
 
-        user = User(
-            username=username,
-            password=generate_password_hash(password, method='sha256')
-        )
+        try:
+            with instrumentasi.ukur('hash'):
+                hash_password = pool_hash.buat(password)
+        except otentikasi.AntrianPenuh:
+            return _tolak('register.html', 503, 'Server sedang sibuk, silakan coba lagi.', 1)
+        user = User(username=username, password=hash_password)
         db.session.add(user)
         db.session.commit()
         flash('Akun berhasil dibuat! Silakan login.', 'success')
@@ -407,13 +791,104 @@ def logout():
 # ADMIN DASHBOARD
 # -----------------------------------
 @app.route('/admin')
+@instr.anggaran_query(2)
 @login_required
 def admin_index():
     if not current_user.is_admin:
         flash('Akses ditolak! Hanya admin yang boleh masuk.', 'danger')
         return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
+
+    per_halaman = app.config['ADMIN_PER_HALAMAN']
+    sebelum = request.args.get('sebelum', type=int)
+    query = select(*KOLOM_ADMIN).where(*_filter_admin(request.args))
+    if sebelum:
+        query = query.where(Berita.id < sebelum)
+    berita = db.session.execute(query.order_by(Berita.id.desc()).limit(per_halaman + 1)).all()
+    berikutnya = None
+    if len(berita) > per_halaman:
+        berita = berita[:per_halaman]
+        berikutnya = berita[-1].id
+    filter_aktif = {k: request.args[k] for k in ('penulis', 'status') if request.args.get(k)}
+    return render_template('admin_index.html', berita=berita, berikutnya=berikutnya,
+                           lanjutan=bool(sebelum), filter=filter_aktif)
+
+
+def _filter_admin(args):
+    kondisi = []
+    if args.get('penulis'):
+        kondisi.append(Berita.penulis == args['penulis'])
+    if args.get('status') in ('terbit', 'disembunyikan'):
+        kondisi.append(Berita.terbit == (args['status'] == 'terbit'))
+    return kondisi
+
+
+def hapus_massal(kondisi):
+    """Hapus semua berita yang cocok dengan satu DELETE; file upload dibersihkan di latar belakang."""
+    ids = db.session.scalars(select(Berita.id).where(*kondisi)).all()
+    gambar = db.session.scalars(select(Berita.gambar).where(*kondisi, Berita.gambar.isnot(None)).distinct()).all()
+    jumlah = db.session.execute(
+        delete(Berita).where(*kondisi).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    invalidasi_cache(*ids)
+    jadwalkan_sindikasi(*ids)
+    if gambar:
+        antrian_job.kirim('gambar.bersihkan', {'nama': gambar})
+    return jumlah
+
+
+def atur_terbit_massal(kondisi, terbit):
+    # UPDATE massal melewati version_id_col ORM, jadi versi & diperbarui dinaikkan sendiri
+    # supaya ETag halaman dan validator beranda ikut berubah
+    kondisi = [*kondisi, Berita.terbit != terbit]
+    ids = db.session.scalars(select(Berita.id).where(*kondisi)).all()
+    jumlah = db.session.execute(
+        update(Berita).where(*kondisi)
+        .values(terbit=terbit, versi=Berita.versi + 1, diperbarui=_sekarang())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    invalidasi_cache(*ids)
+    jadwalkan_sindikasi(*ids)
+    return jumlah
+
+
+@app.route('/admin/massal', methods=['POST'])
+@login_required
+def aksi_massal():
+    if not current_user.is_admin:
+        flash('Akses ditolak!', 'danger')
+        return redirect(url_for('index'))
+
+    filter_aktif = {k: request.form.get(k) for k in ('penulis', 'status') if request.form.get(k)}
+    if request.form.get('semua'):
+        # Semua berita yang cocok dengan filter, bukan hanya yang tampil di halaman ini
+        kondisi = _filter_admin(request.form)
+    else:
+        ids = request.form.getlist('id', type=int)
+        if not ids:
+            flash('Pilih minimal satu berita.', 'warning')
+            return redirect(url_for('admin_index', **filter_aktif))
+        kondisi = [Berita.id.in_(ids)]
+
+    aksi = request.form.get('aksi')
+    if aksi == 'hapus':
+        flash(f'{hapus_massal(kondisi)} berita dihapus.', 'info')
+    elif aksi in ('sembunyikan', 'terbitkan'):
+        jumlah = atur_terbit_massal(kondisi, aksi == 'terbitkan')
+        flash(f'{jumlah} berita {"diterbitkan" if aksi == "terbitkan" else "disembunyikan"}.', 'info')
+    else:
+        flash('Aksi tidak dikenal.', 'danger')
+    return redirect(url_for('admin_index', **filter_aktif))
+
+
+@app.route('/admin/cache')
+@login_required
+def admin_cache():
+    if not current_user.is_admin:
+        flash('Akses ditolak!', 'danger')
+        return redirect(url_for('index'))
+    return jsonify(page_cache.statistik())
 
 
 @app.route('/admin/tambah', methods=['GET', 'POST'])
@@ -427,17 +902,34 @@ def tambah():
         judul = request.form['judul']
         isi = request.form['isi']
         gambar = None
-
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
-
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
+        gambar_baru = False
+        maks_byte = app.config['UPLOAD_MAKS_MB'] * 1024 * 1024
+
+        try:
+            if request.form.get('unggahan'):
+                # File sudah dikirim bertahap lewat /admin/unggah
+                gambar, gambar_baru = penyimpanan.selesaikan_sesi(
+                    app.config['UPLOAD_FOLDER'], app.config['UNGGAH_SESI_DIR'],
+                    request.form['unggahan'], maks_byte,
+                )
+            elif 'gambar' in request.files:
+                file = request.files['gambar']
+                if file.filename:
+                    if not penyimpanan.mimetype_diterima(file.mimetype):
+                        raise penyimpanan.UploadDitolak('File harus berupa gambar.')
+                    gambar, gambar_baru = penyimpanan.simpan(app.config['UPLOAD_FOLDER'], file.stream, maks_byte)
+        except penyimpanan.UploadDitolak as e:
+            flash(str(e), 'danger')
+            return render_template('admin_form.html'), 400
+
+        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username, **teks.ringkas(isi))
         db.session.add(berita)
         db.session.commit()
+        invalidasi_cache(berita.id)
+        jadwalkan_sindikasi(berita.id)
+        # Gambar yang sama sudah pernah diunggah berarti variannya juga sudah ada
+        if gambar_baru and pengolah_gambar.aktif():
+            antrian_job.kirim('gambar.varian', {'id': berita.id, 'nama': gambar})
         flash('Berita berhasil ditambahkan!', 'success')
         return redirect(url_for('admin_index'))
 
@@ -451,27 +943,468 @@ def hapus(id):
         flash('Akses ditolak!', 'danger')
         return redirect(url_for('index'))
 
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
+    if not hapus_massal([Berita.id == id]):
+        abort(404)
     flash('Berita berhasil dihapus.', 'info')
     return redirect(url_for('admin_index'))
 
 
 # -----------------------------------
-# INISIALISASI DATABASE OTOMATIS
+# UNGGAHAN BERTAHAP
+# -----------------------------------
+def _admin_api():
+    if not current_user.is_admin:
+        abort(403)
+
+
+@app.route('/admin/unggah', methods=['POST'])
+@login_required
+def unggah_mulai():
+    _admin_api()
+    penyimpanan.bersihkan_sesi(app.config['UNGGAH_SESI_DIR'], app.config['UNGGAH_SESI_UMUR'])
+    id_sesi = penyimpanan.sesi_baru(app.config['UNGGAH_SESI_DIR'])
+    resp = jsonify(id=id_sesi, offset=0)
+    resp.status_code = 201
+    resp.headers['Location'] = url_for('unggah_potongan', id_sesi=id_sesi)
+    return resp
+
+
+@app.route('/admin/unggah/<id_sesi>', methods=['HEAD', 'PATCH'])
+@login_required
+def unggah_potongan(id_sesi):
+    _admin_api()
+    folder_sesi = app.config['UNGGAH_SESI_DIR']
+    try:
+        offset = penyimpanan.offset_sesi(folder_sesi, id_sesi)
+        if offset is None:
+            abort(404)
+        if request.method == 'PATCH':
+            offset = penyimpanan.tambah_potongan(
+                folder_sesi, id_sesi, request.headers.get('Upload-Offset', type=int),
+                request.stream, app.config['UPLOAD_MAKS_MB'] * 1024 * 1024,
+            )
+    except penyimpanan.UploadDitolak as e:
+        resp = jsonify(error=str(e), offset=penyimpanan.offset_sesi(folder_sesi, id_sesi))
+        # 409: klien cukup melanjutkan dari offset server; 422: isi file ditolak
+        resp.status_code = 409 if isinstance(e, penyimpanan.OffsetTidakCocok) else 422
+        return resp
+    resp = app.response_class(status=204)
+    resp.headers['Upload-Offset'] = str(offset)
+    return resp
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_terlalu_besar(e):
+    pesan = f'Ukuran file melebihi batas {app.config["UPLOAD_MAKS_MB"]} MB.'
+    if request.endpoint == 'tambah':
+        flash(pesan, 'danger')
+        return redirect(url_for('tambah'))
+    resp = jsonify(error=pesan)
+    resp.status_code = 413
+    return resp
+
+
+# -----------------------------------
+# METRIK
+# -----------------------------------
+instrumentasi.gauge('berita_page_cache', 'Hit/miss cache halaman sejak proses dimulai',
+                    lambda: {f'hasil="{k}"': page_cache.statistik()[k] for k in ('hit', 'miss')})
+instrumentasi.gauge('berita_user_cache', 'Hit/miss cache identitas user sejak proses dimulai',
+                    lambda: {f'hasil="{k}"': user_cache.statistik()[k] for k in ('hit', 'miss')})
+instrumentasi.gauge('berita_hash_antrian', 'Hash password yang sedang berjalan atau mengantri',
+                    lambda: pool_hash.antri)
+instrumentasi.gauge('berita_job', 'Job antrian latar belakang per status',
+                    lambda: {f'status="{k}"': v for k, v in antrian_job.statistik().items() if k in antrian.STATUS})
+instrumentasi.gauge('berita_job_tertua_detik', 'Umur job siap jalan tertua yang belum diambil pekerja',
+                    lambda: antrian_job.statistik()['tertua_detik'])
+
+
+def _latensi_job():
+    hasil = {}
+    for nama, (_, tunggu, jalan) in antrian_job.latensi().items():
+        hasil[f'nama="{nama}",tahap="tunggu"'] = f'{tunggu:.3f}'
+        hasil[f'nama="{nama}",tahap="jalan"'] = f'{jalan:.3f}'
+    return hasil
+
+
+instrumentasi.gauge('berita_job_latensi_detik', 'Rata-rata detik menunggu & berjalan job yang selesai 5 menit terakhir',
+                    _latensi_job)
+
+
+@app.route('/metrics')
+def metrics():
+    if not instrumentasi.aktif:
+        abort(404)
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(401)
+    return app.response_class(instrumentasi.prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+# -----------------------------------
+# INISIALISASI DATABASE
 # -----------------------------------
-@app.before_first_request
+def isi_ringkasan(conn, batch=1000):
+    # Hitung kolom turunan untuk berita lama, per batch id supaya isi tidak dimuat sekaligus.
+    # diperbarui diisi nilainya sendiri supaya onupdate tidak menandai semua berita berubah.
+    ubah = (update(Berita).where(Berita.id == bindparam('b_id'))
+            .values(ringkasan=bindparam('b_ringkasan'), jumlah_kata=bindparam('b_jumlah_kata'),
+                    waktu_baca=bindparam('b_waktu_baca'), diperbarui=Berita.diperbarui))
+    terakhir = 0
+    while True:
+        rows = conn.execute(select(Berita.id, Berita.isi).where(Berita.id > terakhir)
+                            .order_by(Berita.id).limit(batch)).all()
+        if not rows:
+            break
+        nilai = []
+        for id, isi in rows:
+            turunan = teks.ringkas(isi)
+            nilai.append({'b_id': id, **{f'b_{k}': v for k, v in turunan.items()}})
+        conn.execute(ubah, nilai)
+        terakhir = rows[-1].id
+
+
+# Kolom yang ditambahkan setelah tabel dibuat; create_all() tidak mengubah tabel lama.
+# Format: (tabel, kolom, definisi, SQL atau fungsi(conn) pengisi nilai awal). Nilai waktu awal
+# ditulis dengan format yang sama seperti DateTime SQLAlchemy supaya perbandingan teks tetap benar.
+WAKTU_SEKARANG_SQL = "strftime('%Y-%m-%d %H:%M:%S.000000', 'now')"
+MIGRASI_KOLOM = [
+    ('berita', 'diperbarui', 'DATETIME', f"UPDATE berita SET diperbarui = {WAKTU_SEKARANG_SQL}"),
+    ('berita', 'versi', 'INTEGER NOT NULL DEFAULT 1', None),
+    ('berita', 'created_at', 'DATETIME', "UPDATE berita SET created_at = diperbarui"),
+    ('berita', 'terbit', 'BOOLEAN NOT NULL DEFAULT 1', None),
+    ('berita', 'jumlah_kata', 'INTEGER NOT NULL DEFAULT 0', None),
+    ('berita', 'waktu_baca', 'INTEGER NOT NULL DEFAULT 1', None),
+    ('berita', 'ringkasan', 'VARCHAR(300)', isi_ringkasan),
+]
+
+
+def _kolom_ada(tabel, kolom):
+    # Inspector baru setiap kali: hasil inspector di-cache dan tidak melihat ALTER proses lain
+    return kolom in {k['name'] for k in inspect(db.engine).get_columns(tabel)}
+
+
+def migrasi_kolom():
+    for tabel, kolom, definisi, isi_awal in MIGRASI_KOLOM:
+        if _kolom_ada(tabel, kolom):
+            continue
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {tabel} ADD COLUMN {kolom} {definisi}'))
+                if callable(isi_awal):
+                    isi_awal(conn)
+                elif isi_awal:
+                    conn.execute(text(isi_awal))
+        except (OperationalError, ProgrammingError):
+            # "duplicate column": proses lain sudah lebih dulu menambahkannya
+            if not _kolom_ada(tabel, kolom):
+                raise
+
+    # create_all() juga tidak menambah indeks baru ke tabel yang sudah ada
+    for tabel in db.metadata.sorted_tables:
+        for indeks in tabel.indexes:
+            indeks.create(bind=db.engine, checkfirst=True)
+
+
 def init_db():
     db.create_all()
+    # Indeks & trigger FTS dulu, supaya pengisian kolom baru di migrasi tidak ikut menulis ulang indeks
+    if pencarian.tersedia(db):
+        pencarian.siapkan_indeks(db)
+    migrasi_kolom()
     if not User.query.filter_by(username='admin').first():
         admin = User(
             username='admin',
-            password=generate_password_hash('admin', method='sha256'),
+            password=generate_password_hash('admin', method=app.config['HASH_METODE']),
             is_admin=True
         )
         db.session.add(admin)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Worker lain sudah lebih dulu membuat akun admin
+            db.session.rollback()
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Buat skema database, indeks pencarian, dan akun admin bawaan."""
+    init_db()
+    click.echo('Database siap.')
+
+
+@app.cli.command('bangun-aset')
+@click.option('--bersihkan', is_flag=True, help='Hapus file dist lama yang tidak ada di manifest baru.')
+def bangun_aset_command(bersihkan):
+    """Salin aset static ke static/dist dengan nama ber-hash plus varian .gz/.br."""
+    manifest = aset.bangun(app.static_folder, bersihkan=bersihkan)
+    for asli, hasil in sorted(manifest.items()):
+        click.echo(f'{asli} -> {hasil}')
+    if berkas.brotli is None:
+        click.echo('Modul brotli tidak terpasang; hanya varian .gz yang dibuat.', err=True)
+    click.echo('Restart aplikasi supaya manifest baru dipakai.')
+
+
+@app.cli.command('export-static')
+@click.option('--folder', default=None, help='Folder tujuan (bawaan: EKSPOR_DIR).')
+def export_static_command(folder):
+    """Render beranda, semua halaman lanjutan, dan setiap berita ke file HTML statis."""
+    if folder:
+        pengekspor.folder = folder
+    semua_id = db.session.scalars(select(Berita.id).order_by(Berita.id)).all()
+    db.session.remove()
+    halaman, berita = pengekspor.semua(semua_id)
+    click.echo(f'{halaman} halaman daftar dan {berita} berita diekspor ke {pengekspor.folder}.')
+
+
+@app.cli.command('bangun-sindikasi')
+def bangun_sindikasi_command():
+    """Bangun ulang /feed.xml dan semua shard sitemap sekarang juga."""
+    bangun_feed()
+    bangun_sitemap()
+    click.echo(f'Feed dan {_jumlah_shard()} shard sitemap ditulis ke {app.config["SINDIKASI_DIR"]}.')
+
+
+@app.cli.command('worker')
+@click.option('--interval', default=1.0, show_default=True, help='Detik jeda memeriksa antrian saat kosong.')
+@click.option('--sekali', is_flag=True, help='Kerjakan job yang siap lalu keluar.')
+def worker_command(interval, sekali):
+    """Jalankan pekerja antrian job (pakai bersama ANTRIAN_MODE=pekerja)."""
+    berhenti = threading.Event()
+    # SIGTERM dari supervisor: selesaikan job yang sedang berjalan dulu
+    signal.signal(signal.SIGTERM, lambda *_: berhenti.set())
+    click.echo(f'Pekerja antrian {app.config["ANTRIAN_DB"]} berjalan.', err=True)
+    try:
+        jumlah = antrian_job.kerjakan(app.app_context, berhenti, interval, sekali)
+    except KeyboardInterrupt:
+        jumlah = None
+    if jumlah is not None:
+        click.echo(f'{jumlah} job dikerjakan.', err=True)
+
+
+antrian_cli = AppGroup('antrian', help='Periksa dan kelola antrian job latar belakang.')
+app.cli.add_command(antrian_cli)
+
+
+@antrian_cli.command('status')
+def antrian_status_command():
+    """Tampilkan jumlah job per status, latensi terakhir, dan job yang gagal."""
+    statistik = antrian_job.statistik()
+    click.echo(' '.join(f'{k}={statistik[k]}' for k in antrian.STATUS)
+               + f' tertua={statistik["tertua_detik"]:.1f}s')
+    for nama, (jumlah, tunggu, jalan) in sorted(antrian_job.latensi().items()):
+        click.echo(f'  {nama}: {jumlah} selesai, tunggu {tunggu * 1000:.0f} ms, jalan {jalan * 1000:.0f} ms')
+    for id, nama, payload, percobaan, error in antrian_job.daftar_gagal():
+        baris_terakhir = (error or '').strip().splitlines()[-1:] or ['']
+        click.echo(f'  gagal #{id} {nama} {payload} ({percobaan}x): {baris_terakhir[0]}')
+
+
+@antrian_cli.command('ulang')
+def antrian_ulang_command():
+    """Masukkan kembali semua job gagal ke antrian."""
+    click.echo(f'{antrian_job.ulang_gagal()} job dijadwalkan ulang.')
+
+
+berita_cli = AppGroup('berita', help='Impor dan ekspor arsip berita dalam jumlah besar.')
+app.cli.add_command(berita_cli)
+
+
+def _gambar_arsip(relatif, gambar_dir):
+    # Kembalikan (path upload, file baru?) atau None jika gambar tidak bisa dipakai
+    if gambar_dir is None:
+        # Nilai dari file impor: hanya file yang memang ada di dalam folder upload
+        path = penyimpanan.path_aman(app.config['UPLOAD_FOLDER'], relatif)
+        return (relatif, False) if path is not None and os.path.isfile(path) else None
+    sumber = os.path.realpath(os.path.join(gambar_dir, relatif))
+    if not sumber.startswith(os.path.realpath(gambar_dir) + os.sep):
+        return None
+    try:
+        with open(sumber, 'rb') as f:
+            return penyimpanan.simpan(app.config['UPLOAD_FOLDER'], f, app.config['UPLOAD_MAKS_MB'] * 1024 * 1024)
+    except (OSError, penyimpanan.UploadDitolak):
+        return None
+
+
+@berita_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', type=click.Choice(['jsonl', 'csv']), help='Bawaan: dari ekstensi file.')
+@click.option('--batch', default=1000, show_default=True, help='Baris per INSERT executemany dan commit.')
+@click.option('--gambar-dir', type=click.Path(exists=True, file_okay=False),
+              help='Folder sumber untuk kolom gambar; tanpa ini gambar harus sudah ada di folder upload.')
+@click.option('--tanpa-varian', is_flag=True, help='Jangan buat varian responsif untuk gambar baru.')
+@click.option('--ulang', is_flag=True, help='Abaikan checkpoint dan mulai dari baris pertama.')
+def berita_import_command(path, format, batch, gambar_dir, tanpa_varian, ulang):
+    """Impor berita dari JSONL/CSV; dilanjutkan dari checkpoint jika sebelumnya terputus."""
+    format = arsip.tebak_format(path, format)
+    checkpoint = path + '.checkpoint'
+    lewati = 0 if ulang else arsip.baca_checkpoint(checkpoint)
+    if lewati:
+        click.echo(f'Melanjutkan dari checkpoint: {lewati} baris pertama dilewati.', err=True)
+
+    kemajuan = arsip.Kemajuan('impor')
+    sekarang = _sekarang()
+    antrean, gambar_baru, salah = [], [], 0
+
+    def simpan_batch(nomor):
+        if antrean:
+            db.session.execute(insert(Berita), antrean)
+            db.session.commit()
+            kemajuan.tambah(len(antrean))
+        arsip.tulis_checkpoint(checkpoint, nomor)
+        if not tanpa_varian and pengolah_gambar.aktif():
+            for nama in gambar_baru:
+                try:
+                    pengolah_gambar.buat_varian(app.config['UPLOAD_FOLDER'], nama)
+                except Exception:
+                    app.logger.exception('Gagal membuat varian gambar %s', nama)
+        antrean.clear()
+        gambar_baru.clear()
+
+    nomor = lewati
+    with open(path, newline='', encoding='utf-8') as f:
+        try:
+            for nomor, data in enumerate(arsip.baca(f, format), 1):
+                if nomor <= lewati:
+                    continue
+                try:
+                    nilai = arsip.normalisasi(data, sekarang)
+                except arsip.BarisTidakValid as e:
+                    salah += 1
+                    click.echo(f'\nbaris {nomor} dilewati: {e}', err=True)
+                    continue
+                if nilai['gambar']:
+                    hasil = _gambar_arsip(nilai['gambar'], gambar_dir)
+                    if hasil is None:
+                        click.echo(f'\nbaris {nomor}: gambar {nilai["gambar"]!r} tidak bisa dipakai', err=True)
+                        nilai['gambar'] = None
+                    else:
+                        nilai['gambar'], baru = hasil
+                        if baru:
+                            gambar_baru.append(nilai['gambar'])
+                antrean.append(nilai)
+                if len(antrean) >= batch:
+                    simpan_batch(nomor)
+        except arsip.BarisTidakValid as e:
+            simpan_batch(nomor)
+            raise click.ClickException(f'{e}. Perbaiki file lalu jalankan ulang untuk melanjutkan.')
+        simpan_batch(nomor)
+
+    kemajuan.selesai()
+    os.remove(checkpoint)
+    invalidasi_cache()
+    jadwalkan_sindikasi(semua=True)
+    click.echo(f'{kemajuan.jumlah} berita diimpor, {salah} baris dilewati.')
+
+
+@berita_cli.command('export')
+@click.argument('path')
+@click.option('--format', type=click.Choice(['jsonl', 'csv']), help='Bawaan: dari ekstensi file (`-` = stdout JSONL).')
+@click.option('--batch', default=1000, show_default=True, help='Baris yang diambil dari database per putaran.')
+@click.option('--gambar-dir', type=click.Path(file_okay=False), help='Salin juga file gambar ke folder ini.')
+def berita_export_command(path, format, batch, gambar_dir):
+    """Ekspor semua berita ke JSONL/CSV (bisa diimpor ulang dengan `flask berita import`)."""
+    format = arsip.tebak_format(path, format)
+    query = (select(Berita.id, Berita.judul, Berita.isi, Berita.penulis, Berita.gambar, Berita.created_at)
+             .order_by(Berita.id).execution_options(yield_per=batch))
+    baris_baris = ({**b._asdict(), 'created_at': b.created_at.isoformat()} for b in db.session.execute(query))
+
+    kemajuan = arsip.Kemajuan('ekspor')
+    f = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+    try:
+        for baris in arsip.tulis(f, format, baris_baris):
+            if gambar_dir and baris['gambar']:
+                arsip.salin_gambar(app.config['UPLOAD_FOLDER'], baris['gambar'], gambar_dir)
+            kemajuan.tambah(1)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    kemajuan.selesai()
+
+
+@app.cli.command('sinkron-replika')
+def sinkron_replika_command():
+    """Salin database SQLite primary ke setiap replika SQLite (untuk uji lokal)."""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('Replika non-SQLite disinkronkan oleh replikasi database itu sendiri.')
+    for engine in rute_replika.engines:
+        with db.engine.connect() as asal, engine.connect() as tujuan:
+            asal.connection.dbapi_connection.backup(tujuan.connection.dbapi_connection)
+        click.echo(f'Disalin ke {engine.url}')
+
+
+@app.cli.command('audit-query')
+def audit_query_command():
+    """Jalankan route publik dan gagal jika ada full table scan atau anggaran query terlampaui."""
+    global page_cache
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('audit-query hanya mendukung SQLite (EXPLAIN QUERY PLAN).')
+
+    tabel = set(db.metadata.tables)
+    temuan = []
+
+    def periksa(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith('SELECT'):
+            return
+        plan = conn.connection.cursor()
+        try:
+            baris = plan.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        finally:
+            plan.close()
+        for *_, detail in baris:
+            m = re.match(r'SCAN (\w+)', detail)
+            if m and m.group(1) in tabel and 'USING' not in detail:
+                temuan.append((request.full_path, detail, ' '.join(statement.split())))
+
+    # Cache dimatikan supaya setiap route benar-benar menjalankan query-nya
+    page_cache, cache_asli = cache.NullCache(), page_cache
+    event.listen(db.engine, 'before_cursor_execute', periksa)
+    melebihi = []
+
+    def jalankan(method, path, **kwargs):
+        with instr.hitung_query() as penghitung:
+            client.open(path, method=method, **kwargs)
+        endpoint, _ = app.url_map.bind('localhost').match(path.split('?')[0], method)
+        maks = getattr(app.view_functions[endpoint], 'anggaran_query', None)
+        if maks is not None and penghitung.jumlah > maks:
+            melebihi.append((path, penghitung, maks))
+
+    try:
+        id_contoh = db.session.query(func.max(Berita.id)).scalar() or 1
+        client = app.test_client()
+        for path in ('/', f'/?after={id_contoh}', '/?q=berita', '/?q=berita&hal=2', f'/berita/{id_contoh}'):
+            jalankan('GET', path)
+        jalankan('POST', '/login', data={'username': 'audit-tidak-ada', 'password': 'x'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', periksa)
+        page_cache = cache_asli
+
+    for path, detail, statement in temuan:
+        click.echo(f'{path}: {detail}\n    {statement}', err=True)
+    for path, penghitung, maks in melebihi:
+        click.echo(f'{path}: {penghitung.jumlah} query (anggaran {maks})\n{penghitung.ringkasan()}', err=True)
+    if temuan or melebihi:
+        raise click.ClickException(
+            f'{len(temuan)} query melakukan full table scan, {len(melebihi)} route melebihi anggaran query.'
+        )
+    click.echo('Semua query route memakai indeks dan sesuai anggaran.')
+
+
+@contextmanager
+def _kunci_init_db():
+    # Worker yang mengimpor aplikasi bersamaan menjalankan DDL init_db satu per satu;
+    # proses berikutnya hanya mendapati skema yang sudah lengkap
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, 'init-db.lock'), 'w') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+# Dijalankan sekali per proses saat startup, bukan di setiap request. Di bawah gunicorn,
+# hook on_starting (gunicorn.conf.py) sudah menjalankannya di master dan mematikan ini.
+if app.config['AUTO_INIT_DB']:
+    with _kunci_init_db(), app.app_context():
+        init_db()
 
 
 # -----------------------------------
@@ -479,559 +1412,4 @@ def init_db():
 # -----------------------------------
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)    penulis = db.Column(db.String(100), nullable=False)
-
-# -----------------------------------
-# LOGIN MANAGEMENT
-# -----------------------------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# -----------------------------------
-# ROUTES UTAMA
-# -----------------------------------
-@app.route('/')
-def index():
-    q = request.args.get('q', '')
-    if q:
-        berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all()
-    else:
-        berita = Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
-
-@app.route('/berita/<int:id>')
-def detail(id):
-    b = Berita.query.get_or_404(id)
-    return render_template('detail.html', berita=b)
-
-# -----------------------------------
-# LOGIN & REGISTER
-# -----------------------------------
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
-            login_user(user)
-            flash('Login berhasil!', 'success')
-            return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
-        flash('Username atau password salah!', 'danger')
-    return render_template('login.html')
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
-        if User.query.filter_by(username=username).first():
-            flash('Username sudah digunakan!', 'warning')
-            return redirect(url_for('register'))
-        user = User(username=username, password=generate_password_hash(password, method='sha256'))
-        db.session.add(user)
-        db.session.commit()
-        flash('Akun berhasil dibuat! Silakan login.', 'success')
-        return redirect(url_for('login'))
-    return render_template('register.html')
-
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Kamu telah logout.', 'info')
-    return redirect(url_for('index'))
-
-# -----------------------------------
-# ADMIN DASHBOARD
-# -----------------------------------
-@app.route('/admin')
-@login_required
-def admin_index():
-    if not current_user.is_admin:
-        flash('Akses ditolak! Hanya admin yang boleh masuk.', 'danger')
-        return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
-
-@app.route('/admin/tambah', methods=['GET', 'POST'])
-@login_required
-def tambah():
-    if not current_user.is_admin:
-        flash('Hanya admin yang bisa menambah berita.', 'danger')
-        return redirect(url_for('index'))
-
-    if request.method == 'POST':
-        judul = request.form['judul']
-        isi = request.form['isi']
-        gambar = None
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
-        db.session.add(berita)
-        db.session.commit()
-        flash('Berita berhasil ditambahkan!', 'success')
-        return redirect(url_for('admin_index'))
-    return render_template('admin_form.html')
-
-@app.route('/admin/hapus/<int:id>')
-@login_required
-def hapus(id):
-    if not current_user.is_admin:
-        flash('Akses ditolak!', 'danger')
-        return redirect(url_for('index'))
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
-    flash('Berita berhasil dihapus.', 'info')
-    return redirect(url_for('admin_index'))
-
-# -----------------------------------
-# INISIALISASI DATABASE
-# -----------------------------------
-@app.before_first_request
-def init_db():
-    db.create_all()
-    if not User.query.filter_by(username='admin').first():
-        admin = User(username='admin', password=generate_password_hash('admin', method='sha256'), is_admin=True)
-        db.session.add(admin)
-        db.session.commit()
-
-# -----------------------------------
-# MENJALANKAN APLIKASI
-# -----------------------------------
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port)    isi = db.Column(db.Text, nullable=False)
-    gambar = db.Column(db.String(200), nullable=True)
-    penulis = db.Column(db.String(100), nullable=False)
-
-
-# -----------------------------------
-# LOGIN MANAGEMENT
-# -----------------------------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-
-# -----------------------------------
-# ROUTES UTAMA
-# -----------------------------------
-@app.route('/')
-def index():
-    q = request.args.get('q', '')
-    if q:
-        berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all()
-    else:
-        berita = Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
-
-
-@app.route('/berita/<int:id>')
-def detail(id):
-    b = Berita.query.get_or_404(id)
-    return render_template('detail.html', berita=b)
-
-
-# -----------------------------------
-# LOGIN & REGISTER
-# -----------------------------------
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
-            login_user(user)
-            flash('Login berhasil!', 'success')
-            return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
-        flash('Username atau password salah!', 'danger')
-    return render_template('login.html')
-
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
-
-        if User.query.filter_by(username=username).first():
-            flash('Username sudah digunakan!', 'warning')
-            return redirect(url_for('register'))
-
-        user = User(
-            username=username,
-            password=generate_password_hash(password, method='sha256')
-        )
-        db.session.add(user)
-        db.session.commit()
-        flash('Akun berhasil dibuat! Silakan login.', 'success')
-        return redirect(url_for('login'))
-
-    return render_template('register.html')
-
-
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Kamu telah logout.', 'info')
-    return redirect(url_for('index'))
-
-
-# -----------------------------------
-# ADMIN DASHBOARD
-# -----------------------------------
-@app.route('/admin')
-@login_required
-def admin_index():
-    if not current_user.is_admin:
-        flash('Akses ditolak! Hanya admin yang boleh masuk.', 'danger')
-        return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
-
-
-@app.route('/admin/tambah', methods=['GET', 'POST'])
-@login_required
-def tambah():
-    if not current_user.is_admin:
-        flash('Hanya admin yang bisa menambah berita.', 'danger')
-        return redirect(url_for('index'))
-
-    if request.method == 'POST':
-        judul = request.form['judul']
-        isi = request.form['isi']
-        gambar = None
-
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
-
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
-        db.session.add(berita)
-        db.session.commit()
-        flash('Berita berhasil ditambahkan!', 'success')
-        return redirect(url_for('admin_index'))
-
-    return render_template('admin_form.html')
-
-
-@app.route('/admin/hapus/<int:id>')
-@login_required
-def hapus(id):
-    if not current_user.is_admin:
-        flash('Akses ditolak!', 'danger')
-        return redirect(url_for('index'))
-
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
-    flash('Berita berhasil dihapus.', 'info')
-    return redirect(url_for('admin_index'))
-
-
-# -----------------------------------
-# INISIALISASI DATABASE OTOMATIS
-# -----------------------------------
-@app.before_first_request
-def init_db():
-    db.create_all()
-    if not User.query.filter_by(username='admin').first():
-        admin = User(
-            username='admin',
-            password=generate_password_hash('admin', method='sha256'),
-            is_admin=True
-        )
-        db.session.add(admin)
-        db.session.commit()
-
-
-# -----------------------------------
-# MENJALANKAN APLIKASI
-# -----------------------------------
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=int(os.environ.get("PORT", 5000)), debug=True)    judul = db.Column(db.String(200), nullable=False)
-    isi = db.Column(db.Text, nullable=False)
-    gambar = db.Column(db.String(200), nullable=True)
-    penulis = db.Column(db.String(100), nullable=False)
-
-
-# -----------------------------------
-# LOGIN MANAGEMENT
-# -----------------------------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-
-# -----------------------------------
-# ROUTES UTAMA
-# -----------------------------------
-@app.route('/')
-def index():
-    q = request.args.get('q', '')
-    if q:
-        berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all()
-    else:
-        berita = Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
-
-
-@app.route('/berita/<int:id>')
-def detail(id):
-    b = Berita.query.get_or_404(id)
-    return render_template('detail.html', berita=b)
-
-
-# -----------------------------------
-# LOGIN & REGISTER
-# -----------------------------------
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
-            login_user(user)
-            flash('Login berhasil!', 'success')
-            return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
-        else:
-            flash('Username atau password salah!', 'danger')
-    return render_template('login.html')
-
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        username = request.form['username']
-        password = request.form['password']
-
-        if User.query.filter_by(username=username).first():
-            flash('Username sudah digunakan!', 'warning')
-            return redirect(url_for('register'))
-
-        user = User(
-            username=username,
-            password=generate_password_hash(password, method='sha256')
-        )
-        db.session.add(user)
-        db.session.commit()
-        flash('Akun berhasil dibuat! Silakan login.', 'success')
-        return redirect(url_for('login'))
-
-    return render_template('register.html')
-
-
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Kamu telah logout.', 'info')
-    return redirect(url_for('index'))
-
-
-# -----------------------------------
-# ADMIN DASHBOARD
-# -----------------------------------
-@app.route('/admin')
-@login_required
-def admin_index():
-    if not current_user.is_admin:
-        flash('Akses ditolak! Hanya admin yang boleh masuk.', 'danger')
-        return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
-
-
-@app.route('/admin/tambah', methods=['GET', 'POST'])
-@login_required
-def tambah():
-    if not current_user.is_admin:
-        flash('Hanya admin yang bisa menambah berita.', 'danger')
-        return redirect(url_for('index'))
-
-    if request.method == 'POST':
-        judul = request.form['judul']
-        isi = request.form['isi']
-        gambar = None
-
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
-
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
-        db.session.add(berita)
-        db.session.commit()
-        flash('Berita berhasil ditambahkan!', 'success')
-        return redirect(url_for('admin_index'))
-
-    return render_template('admin_form.html')
-
-
-@app.route('/admin/hapus/<int:id>')
-@login_required
-def hapus(id):
-    if not current_user.is_admin:
-        flash('Akses ditolak!', 'danger')
-        return redirect(url_for('index'))
-
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
-    flash('Berita berhasil dihapus.', 'info')
-    return redirect(url_for('admin_index'))
-
-
-# -----------------------------------
-# INISIALISASI DATABASE OTOMATIS
-# -----------------------------------
-@app.before_first_request
-def init_db():
-    db.create_all()
-    if not User.query.filter_by(username='admin').first():
-        admin = User(
-            username='admin',
-            password=generate_password_hash('admin', method='sha256'),
-            is_admin=True
-        )
-        db.session.add(admin)
-        db.session.commit()
-
-
-# -----------------------------------
-# MENJALANKAN APLIKASI
-# -----------------------------------
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
-
-# -----------------------------------
-# LOGIN MANAGEMENT
-# -----------------------------------
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-
-# -----------------------------------
-# ROUTES
-# -----------------------------------
-@app.route('/')
-def index():
-    q = request.args.get('q', '')
-    if q:
-        berita = Berita.query.filter(Berita.judul.like(f"%{q}%")).all()
-    else:
-        berita = Berita.query.all()
-    return render_template('index.html', berita=berita, q=q)
-
-@app.route('/berita/<int:id>')
-def detail(id):
-    b = Berita.query.get_or_404(id)
-    return render_template('detail.html', berita=b)
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        user = User.query.filter_by(username=request.form['username']).first()
-        if user and check_password_hash(user.password, request.form['password']):
-            login_user(user)
-            flash('Login berhasil!', 'success')
-            return redirect(url_for('admin_index') if user.is_admin else url_for('index'))
-        flash('Username atau password salah!', 'danger')
-    return render_template('login.html')
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        if User.query.filter_by(username=request.form['username']).first():
-            flash('Username sudah digunakan!', 'warning')
-            return redirect(url_for('register'))
-        user = User(
-            username=request.form['username'],
-            password=generate_password_hash(request.form['password'], method='sha256')
-        )
-        db.session.add(user)
-        db.session.commit()
-        flash('Akun berhasil dibuat!', 'success')
-        return redirect(url_for('login'))
-    return render_template('register.html')
-
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('Kamu telah logout.', 'info')
-    return redirect(url_for('index'))
-
-# ----------------- ADMIN -----------------
-@app.route('/admin')
-@login_required
-def admin_index():
-    if not current_user.is_admin:
-        flash('Akses ditolak!', 'danger')
-        return redirect(url_for('index'))
-    semua = Berita.query.all()
-    return render_template('admin_index.html', berita=semua)
-
-@app.route('/admin/tambah', methods=['GET', 'POST'])
-@login_required
-def tambah():
-    if not current_user.is_admin:
-        return redirect(url_for('index'))
-
-    if request.method == 'POST':
-        judul = request.form['judul']
-        isi = request.form['isi']
-        gambar = None
-
-        if 'gambar' in request.files:
-            file = request.files['gambar']
-            if file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                gambar = filename
-
-        berita = Berita(judul=judul, isi=isi, gambar=gambar, penulis=current_user.username)
-        db.session.add(berita)
-        db.session.commit()
-        flash('Berita berhasil ditambahkan!', 'success')
-        return redirect(url_for('admin_index'))
-
-    return render_template('admin_form.html')
-
-@app.route('/admin/hapus/<int:id>')
-@login_required
-def hapus(id):
-    if not current_user.is_admin:
-        return redirect(url_for('index'))
-    b = Berita.query.get_or_404(id)
-    db.session.delete(b)
-    db.session.commit()
-    flash('Berita dihapus.', 'info')
-    return redirect(url_for('admin_index'))
-
-# -----------------------------------
-# INISIALISASI DATABASE
-# -----------------------------------
-@app.before_first_request
-def init_db():
-    db.create_all()
-    if not User.query.filter_by(username='admin').first():
-        admin = User(username='admin', password=generate_password_hash('admin', method='sha256'), is_admin=True)
-        db.session.add(admin)
-        db.session.commit()
-
-# -----------------------------------
-# RUN APP
-# -----------------------------------
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=port, debug=True)
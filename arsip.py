@@ -0,0 +1,149 @@
+import csv
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+
+import teks
+from berkas import tulis_atomik
+
+# -----------------------------------
+# IMPOR & EKSPOR ARSIP BERITA
+# -----------------------------------
+# Format baris (JSONL: satu objek per baris; CSV: header dengan nama kolom):
+#   judul, isi, penulis, gambar (opsional, path relatif ke folder gambar),
+#   created_at (opsional, ISO 8601; tanpa zona waktu dianggap UTC)
+KOLOM = ('id', 'judul', 'isi', 'penulis', 'gambar', 'created_at')
+
+
+class BarisTidakValid(ValueError):
+    pass
+
+
+def tebak_format(path, format=None):
+    if format:
+        return format
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def baca(f, format):
+    """Yield dict per baris dari file JSONL/CSV yang sudah dibuka."""
+    if format == 'csv':
+        # Isi artikel panjang melebihi batas field bawaan modul csv (128 KB)
+        csv.field_size_limit(sys.maxsize)
+        yield from csv.DictReader(f)
+        return
+    for nomor, baris in enumerate(f, 1):
+        if baris.strip():
+            try:
+                yield json.loads(baris)
+            except ValueError as e:
+                raise BarisTidakValid(f'baris {nomor}: JSON tidak valid ({e})')
+
+
+def _waktu(nilai):
+    if not nilai:
+        return None
+    if isinstance(nilai, datetime):
+        waktu = nilai
+    else:
+        waktu = datetime.fromisoformat(str(nilai).replace('Z', '+00:00'))
+    if waktu.tzinfo is not None:
+        waktu = waktu.astimezone(timezone.utc).replace(tzinfo=None)
+    return waktu
+
+
+def normalisasi(data, sekarang):
+    """Ubah satu baris masukan menjadi nilai kolom Berita, atau BarisTidakValid."""
+    judul = (data.get('judul') or '').strip()
+    isi = data.get('isi') or ''
+    if not judul or not isi.strip():
+        raise BarisTidakValid('judul dan isi wajib diisi')
+    try:
+        created_at = _waktu(data.get('created_at')) or sekarang
+    except ValueError:
+        raise BarisTidakValid(f'created_at tidak valid: {data.get("created_at")!r}')
+    # Semua baris punya kunci yang sama supaya satu batch jadi satu executemany
+    return {
+        'judul': judul[:200],
+        'isi': isi,
+        'penulis': (data.get('penulis') or 'admin')[:100],
+        'gambar': data.get('gambar') or None,
+        'created_at': created_at,
+        'diperbarui': created_at,
+        **teks.ringkas(isi),
+    }
+
+
+# -----------------------------------
+# CHECKPOINT
+# -----------------------------------
+# Jumlah baris masukan yang sudah di-commit, ditulis setelah setiap batch.
+# Impor yang terputus dilanjutkan dari sini; paling buruk satu batch terakhir
+# (jika proses mati di antara commit dan penulisan checkpoint) terimpor dua kali.
+def baca_checkpoint(path):
+    try:
+        with open(path) as f:
+            return int(json.load(f)['baris'])
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def tulis_checkpoint(path, baris):
+    tulis_atomik(path, json.dumps({'baris': baris}))
+
+
+class Kemajuan:
+    """Laporan baris/detik ke stderr, paling sering sekali per detik."""
+
+    def __init__(self, label, keluaran=sys.stderr):
+        self.label = label
+        self.keluaran = keluaran
+        self.mulai = time.perf_counter()
+        self._terakhir = self.mulai
+        self.jumlah = 0
+
+    @property
+    def per_detik(self):
+        durasi = time.perf_counter() - self.mulai
+        return self.jumlah / durasi if durasi else 0.0
+
+    def tambah(self, n):
+        self.jumlah += n
+        sekarang = time.perf_counter()
+        if sekarang - self._terakhir >= 1:
+            self._terakhir = sekarang
+            print(f'\r  {self.label}: {self.jumlah} baris, {self.per_detik:.0f} baris/detik',
+                  end='', file=self.keluaran, flush=True)
+
+    def selesai(self):
+        durasi = time.perf_counter() - self.mulai
+        print(f'\r  {self.label}: {self.jumlah} baris dalam {durasi:.1f} s ({self.per_detik:.0f} baris/detik)',
+              file=self.keluaran)
+
+
+def tulis(f, format, baris_baris):
+    """Tulis dict berkolom KOLOM sebagai JSONL/CSV; yield setiap baris yang ditulis."""
+    penulis_csv = None
+    if format == 'csv':
+        penulis_csv = csv.DictWriter(f, fieldnames=KOLOM)
+        penulis_csv.writeheader()
+    for baris in baris_baris:
+        if penulis_csv is not None:
+            penulis_csv.writerow(baris)
+        else:
+            f.write(json.dumps(baris, ensure_ascii=False) + '\n')
+        yield baris
+
+
+def salin_gambar(folder_upload, relatif, folder_tujuan):
+    tujuan = os.path.join(folder_tujuan, relatif)
+    if os.path.exists(tujuan):
+        return
+    os.makedirs(os.path.dirname(tujuan), exist_ok=True)
+    try:
+        shutil.copy2(os.path.join(folder_upload, relatif), tujuan)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+from berkas import tulis_atomik, tulis_varian
+
+# -----------------------------------
+# PIPELINE ASET STATIS
+# -----------------------------------
+# `flask bangun-aset` menyalin setiap file di static/ ke static/dist/ dengan
+# hash isi di namanya (style.css -> dist/style.3f2a9c1b7d04.css) beserta
+# varian .gz/.br. Manifest memetakan nama asli ke nama ber-hash; url_for
+# memakainya sehingga URL aset berubah hanya jika isinya berubah dan boleh
+# di-cache browser selamanya.
+FOLDER_DIST = 'dist'
+NAMA_MANIFEST = 'manifest.json'
+
+# Folder di static/ yang bukan aset build (upload sudah berbasis hash sendiri)
+DILEWATI = ('uploads', FOLDER_DIST)
+
+# Format gambar/font sudah terkompresi; gzip hanya membuang CPU
+EKSTENSI_KOMPRES = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map', '.ico')
+
+# (ekstensi file, nama di Accept-Encoding); urutan = prioritas
+ENKODING = (('.br', 'br'), ('.gz', 'gzip'))
+
+
+def _daftar_sumber(folder_static):
+    for akar, folder, file in os.walk(folder_static):
+        relatif_akar = os.path.relpath(akar, folder_static)
+        if relatif_akar == '.':
+            folder[:] = [d for d in folder if d not in DILEWATI]
+        for nama in sorted(file):
+            if not nama.startswith('.'):
+                yield os.path.normpath(os.path.join(relatif_akar, nama)).replace(os.sep, '/')
+
+
+def bangun(folder_static, bersihkan=False):
+    """Bangun static/dist dan manifest-nya; kembalikan manifest {nama asli: nama dist}."""
+    dist = os.path.join(folder_static, FOLDER_DIST)
+    manifest = {}
+    dibuat = {NAMA_MANIFEST}
+    for relatif in _daftar_sumber(folder_static):
+        with open(os.path.join(folder_static, relatif), 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(relatif)
+        nama = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        tujuan = os.path.join(dist, nama)
+        if not os.path.exists(tujuan):
+            tulis_atomik(tujuan, data)
+        dibuat.add(nama)
+
+        if ext.lower() in EKSTENSI_KOMPRES:
+            for akhiran in tulis_varian(tujuan, data, lewati_ada=True):
+                dibuat.add(nama + akhiran)
+        manifest[relatif] = f'{FOLDER_DIST}/{nama}'
+
+    tulis_atomik(os.path.join(dist, NAMA_MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    if bersihkan:
+        # File lama sengaja disimpan secara bawaan: halaman yang masih di-cache
+        # klien atau CDN bisa tetap merujuk nama ber-hash sebelumnya
+        for relatif in _daftar_sumber(dist):
+            if relatif not in dibuat:
+                os.remove(os.path.join(dist, relatif))
+    return manifest
+
+
+def muat_manifest(folder_static):
+    try:
+        with open(os.path.join(folder_static, FOLDER_DIST, NAMA_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def varian_terkompres(folder_static, filename, accept_encoding):
+    """Pilih (nama file .br/.gz, enkoding) terbaik yang ada dan diterima klien, atau None."""
+    for akhiran, enkoding in ENKODING:
+        # Kualitas, bukan keanggotaan: `gzip;q=0` berarti klien menolak gzip
+        if accept_encoding[enkoding] > 0 and os.path.isfile(os.path.join(folder_static, filename + akhiran)):
+            return filename + akhiran, enkoding
+    return None
@@ -0,0 +1,163 @@
+import random
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.elements import TextClause
+
+# -----------------------------------
+# PROFIL ENGINE DATABASE
+# -----------------------------------
+# Profil `produksi` untuk SQLite: WAL supaya pembaca tidak diblok penulis
+# (dan sebaliknya) antar worker gunicorn, synchronous=NORMAL (aman di WAL,
+# hanya transaksi terakhir yang bisa hilang saat listrik mati), cache halaman
+# dan mmap yang lebih besar, serta busy_timeout supaya penulis yang bertabrakan
+# menunggu alih-alih langsung gagal dengan "database is locked".
+
+
+def _sqlite_memori(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def opsi_engine(uri, config):
+    """Opsi create_engine untuk SQLALCHEMY_ENGINE_OPTIONS sesuai profil."""
+    url = make_url(uri)
+    if config['SQLITE_PROFIL'] == 'bawaan' or _sqlite_memori(url):
+        return {}
+
+    opsi = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_POOL_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+    }
+    if url.get_backend_name() == 'sqlite':
+        # Timeout driver = busy handler SQLite, dalam detik
+        opsi['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    else:
+        # Koneksi server database bisa diputus di sisi server saat idle
+        opsi['pool_pre_ping'] = True
+        opsi['pool_recycle'] = config['DB_POOL_RECYCLE']
+    return opsi
+
+
+def pragma_sqlite(config):
+    if config['SQLITE_PROFIL'] == 'bawaan':
+        return {}
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config['SQLITE_BUSY_TIMEOUT_MS'],
+        # Nilai negatif = ukuran dalam KiB, bukan jumlah halaman
+        'cache_size': -config['SQLITE_CACHE_MB'] * 1024,
+        'mmap_size': config['SQLITE_MMAP_MB'] * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+
+def pasang_pragma(engine, pragma):
+    """Jalankan PRAGMA pada setiap koneksi SQLite baru di pool engine."""
+    if engine.dialect.name != 'sqlite' or not pragma:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _atur(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for nama, nilai in pragma.items():
+                cursor.execute(f'PRAGMA {nama}={nilai}')
+        finally:
+            cursor.close()
+
+
+def pragma_aktif(engine, nama_nama=('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')):
+    with engine.connect() as conn:
+        return {nama: conn.exec_driver_sql(f'PRAGMA {nama}').scalar() for nama in nama_nama}
+
+
+def normalisasi_url(url):
+    # Heroku & sebagian penyedia masih memberi skema `postgres://` yang ditolak SQLAlchemy 2
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+# -----------------------------------
+# REPLIKA BACA
+# -----------------------------------
+# View yang ditandai @baca_replika membaca dari salah satu replika; semua
+# tulis (flush, INSERT/UPDATE/DELETE) tetap ke primary. Setelah klien menulis,
+# bacaannya dilayani primary selama DB_REPLIKA_LENGKET detik supaya perubahan
+# sendiri langsung terlihat walau replika tertinggal (read-your-writes).
+# Kunci environ WSGI untuk request internal yang wajib membaca primary (mis. ekspor statis)
+BACA_PRIMARY = 'berita.baca_primary'
+
+
+def binds_replika(urls, config):
+    binds = {}
+    for i, url in enumerate(u.strip() for u in urls.split(',') if u.strip()):
+        url = normalisasi_url(url)
+        binds[f'replika_{i}'] = {'url': url, **opsi_engine(url, config)}
+    return binds
+
+
+def baca_replika(view):
+    view.baca_replika = True
+    return view
+
+
+class SesiRute(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper, clause, bind, **kwargs)
+        if bind is not None or not has_request_context():
+            return primary
+        if self._flushing or self.new or self.dirty or self.deleted or not _hanya_baca(clause):
+            g._db_menulis = True
+            return primary
+        rute = current_app.extensions.get('rute_replika')
+        if rute is None or not g.get('_db_replika') or g.get('_db_menulis'):
+            return primary
+        return rute.pilih()
+
+
+def _hanya_baca(clause):
+    if clause is None:
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return bool(getattr(clause, 'is_select', False))
+
+
+class RuteReplika:
+    def __init__(self, app=None, db=None):
+        self.engines = []
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.app = app
+        self.db = db
+        self.lengket = app.config['DB_REPLIKA_LENGKET']
+        with app.app_context():
+            self.engines = [e for k, e in db.engines.items() if k and k.startswith('replika_')]
+        if not self.engines:
+            return
+        app.extensions['rute_replika'] = self
+        app.before_request(self._sebelum)
+        app.after_request(self._sesudah)
+
+    def pilih(self):
+        return random.choice(self.engines)
+
+    def _sebelum(self):
+        view = self.app.view_functions.get(request.endpoint)
+        lengket = time.time() - session.get('_db_tulis', 0) < self.lengket
+        primary = lengket or request.environ.get(BACA_PRIMARY, False)
+        g._db_replika = getattr(view, 'baca_replika', False) and not primary
+
+    def _sesudah(self, response):
+        if g.get('_db_menulis'):
+            session['_db_tulis'] = time.time()
+        response.headers['X-DB'] = 'replika' if g.get('_db_replika') and not g.get('_db_menulis') else 'primary'
+        return response
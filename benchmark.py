@@ -0,0 +1,566 @@
+"""Benchmark portal berita.
+
+Contoh:
+    python benchmark.py hook --request 500
+    python benchmark.py rute --ukuran 100000 --db /tmp/bench-100k.db
+    python benchmark.py rute --mode gunicorn --worker 4 --konkurensi 16
+    python benchmark.py rute --simpan-baseline bench_baseline.json
+    python benchmark.py rute --baseline bench_baseline.json
+    python benchmark.py konkurensi --pembaca 4 --durasi 10
+    python benchmark.py serving --konkurensi 32 --worker 2
+    python benchmark.py kompresi --ukuran 1000
+    python benchmark.py memori --ukuran 10000 --per-halaman 50
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import teks
+
+FOLDER_REPO = os.path.dirname(os.path.abspath(__file__))
+
+KATA = (
+    'pemerintah ekonomi daerah warga pemilu banjir jalan sekolah harga pasar '
+    'presiden menteri kota desa petani nelayan listrik air rumah sakit polisi '
+    'pengadilan investasi ekspor impor inflasi pajak anggaran program bantuan'
+).split()
+
+
+def muat_aplikasi(path_db, page_cache='none'):
+    # Database benchmark selalu terpisah dari database aplikasi
+    os.environ['DATABASE_URL'] = 'sqlite:///' + path_db
+    os.environ['PAGE_CACHE'] = page_cache
+    # Rute login diukur ratusan kali berturut-turut; jangan sampai kena 429
+    for batas in ('LOGIN_BATAS_IP', 'LOGIN_BATAS_USER', 'REGISTER_BATAS_IP'):
+        os.environ.setdefault(batas, '1000000/1')
+    import app as aplikasi
+    return aplikasi
+
+
+def _kalimat(rng, n):
+    return ' '.join(rng.choice(KATA) for _ in range(n)).capitalize() + '.'
+
+
+def buat_berita(rng, i):
+    # Isi 1-8 KB, kira-kira sebaran panjang artikel berita sungguhan
+    paragraf = [' '.join(_kalimat(rng, rng.randint(8, 20)) for _ in range(rng.randint(3, 6)))
+                for _ in range(rng.randint(2, 10))]
+    isi = '\n\n'.join(paragraf)
+    return {
+        'judul': _kalimat(rng, rng.randint(5, 12))[:200],
+        'isi': isi,
+        'penulis': rng.choice(('admin', 'redaksi', 'kontributor')),
+        **teks.ringkas(isi),
+    }
+
+
+def isi_contoh(aplikasi, jumlah, batch=5000, seed=42):
+    from sqlalchemy import insert
+
+    rng = random.Random(seed)
+    with aplikasi.app.app_context():
+        sudah = aplikasi.Berita.query.count()
+        if sudah >= jumlah:
+            return
+        mulai = time.perf_counter()
+        for awal in range(sudah, jumlah, batch):
+            baris = [buat_berita(rng, i) for i in range(awal, min(awal + batch, jumlah))]
+            aplikasi.db.session.execute(insert(aplikasi.Berita), baris)
+            aplikasi.db.session.commit()
+            print(f'  seed {awal + len(baris)}/{jumlah}', end='\r', file=sys.stderr)
+        print(f'  seed {jumlah - sudah} berita dalam {time.perf_counter() - mulai:.1f} s', file=sys.stderr)
+
+
+def rss_mb(pid='self'):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for baris in f:
+                if baris.startswith('VmRSS:'):
+                    return int(baris.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid == 'self':
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return None
+
+
+def persentil(durasi, p):
+    urut = sorted(durasi)
+    return urut[min(len(urut) - 1, int(round(p / 100 * (len(urut) - 1))))]
+
+
+def ringkas(durasi, total_detik):
+    return {
+        'n': len(durasi),
+        'p50': persentil(durasi, 50),
+        'p95': persentil(durasi, 95),
+        'p99': persentil(durasi, 99),
+        'rata': statistics.mean(durasi),
+        'rps': len(durasi) / total_detik if total_detik else 0,
+    }
+
+
+def ukur(fungsi, jumlah):
+    durasi = []
+    for _ in range(jumlah):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return statistics.mean(durasi), statistics.median(durasi)
+
+
+def daftar_rute(aplikasi, rng):
+    with aplikasi.app.app_context():
+        id_maks = aplikasi.db.session.query(aplikasi.db.func.max(aplikasi.Berita.id)).scalar() or 1
+    tengah = max(1, id_maks // 2)
+    return {
+        'index': lambda: ('GET', '/', None),
+        'index_halaman': lambda: ('GET', f'/?after={tengah}', None),
+        'cari': lambda: ('GET', f'/?q={rng.choice(KATA)}', None),
+        'detail': lambda: ('GET', f'/berita/{rng.randint(1, id_maks)}', None),
+        'login_form': lambda: ('GET', '/login', None),
+        'login': lambda: ('POST', '/login', {'username': 'admin', 'password': 'admin'}),
+    }
+
+
+# -----------------------------------
+# MODE IN-PROCESS (test client)
+# -----------------------------------
+def jalankan_inproc(aplikasi, rute, args):
+    client = aplikasi.app.test_client()
+    hasil = {}
+    for nama, buat in rute.items():
+        for _ in range(args.pemanasan):
+            metode, path, data = buat()
+            client.open(path, method=metode, data=data)
+            if metode == 'POST':
+                client.get('/logout')
+
+        durasi = []
+        mulai_total = time.perf_counter()
+        for _ in range(args.request):
+            metode, path, data = buat()
+            mulai = time.perf_counter()
+            client.open(path, method=metode, data=data)
+            durasi.append((time.perf_counter() - mulai) * 1000)
+            if metode == 'POST':
+                client.get('/logout')
+        hasil[nama] = ringkas(durasi, time.perf_counter() - mulai_total)
+        hasil[nama]['rss_mb'] = rss_mb()
+    return hasil
+
+
+# -----------------------------------
+# MODE GUNICORN (HTTP sungguhan)
+# -----------------------------------
+def _port_bebas():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _anak_proses(pid):
+    anak = []
+    try:
+        for tid in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{tid}/children') as f:
+                anak += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    return anak
+
+
+def mulai_gunicorn(path_db, args):
+    if shutil.which('gunicorn') is None:
+        raise SystemExit('gunicorn tidak ditemukan; pasang dengan `pip install gunicorn`.')
+    port = _port_bebas()
+    # WORKER_MODE dibaca gunicorn.conf.py (jumlah thread, ukuran pool DB)
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + path_db, PAGE_CACHE=args.page_cache,
+               WORKER_MODE=args.worker_class or 'sync', GUNICORN_THREADS=str(args.threads))
+    perintah = ['gunicorn', 'app:app', '-b', f'127.0.0.1:{port}', '-w', str(args.worker),
+                '--log-level', 'warning']
+    if args.worker_class:
+        perintah += ['-k', args.worker_class]
+    if args.worker_class == 'gthread':
+        perintah += ['--threads', str(args.threads)]
+    proses = subprocess.Popen(perintah, cwd=FOLDER_REPO, env=env)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(url + '/login', timeout=1).read()
+            return proses, url
+        except OSError:  # URLError, koneksi ditolak, atau timeout saat worker masih boot
+            time.sleep(0.1)
+    proses.terminate()
+    raise SystemExit('gunicorn tidak merespons.')
+
+
+def _kirim(url, metode, path, data):
+    body = urllib.parse.urlencode(data).encode() if data else None
+    req = urllib.request.Request(url + path, data=body, method=metode)
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+
+
+def jalankan_http(proses, url, rute, args):
+    hasil = {}
+    for nama, buat in rute.items():
+        for _ in range(args.pemanasan):
+            _kirim(url, *buat())
+
+        durasi = []
+        kunci = threading.Lock()
+        sisa = [args.request]
+
+        def pekerja():
+            while True:
+                with kunci:
+                    if sisa[0] <= 0:
+                        return
+                    sisa[0] -= 1
+                    permintaan = buat()
+                mulai = time.perf_counter()
+                _kirim(url, *permintaan)
+                with kunci:
+                    durasi.append((time.perf_counter() - mulai) * 1000)
+
+        mulai_total = time.perf_counter()
+        threads = [threading.Thread(target=pekerja) for _ in range(args.konkurensi)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        hasil[nama] = ringkas(durasi, time.perf_counter() - mulai_total)
+        hasil[nama]['rss_mb'] = sum(filter(None, (rss_mb(p) for p in [proses.pid] + _anak_proses(proses.pid))))
+    return hasil
+
+
+# -----------------------------------
+# LAPORAN & BASELINE
+# -----------------------------------
+def cetak(hasil):
+    print(f'{"rute":<15}{"n":>6}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}{"RSS MB":>9}')
+    for nama, h in hasil.items():
+        print(f'{nama:<15}{h["n"]:>6}{h["p50"]:>10.2f}{h["p95"]:>10.2f}{h["p99"]:>10.2f}'
+              f'{h["rps"]:>10.1f}{h["rss_mb"] or 0:>9.1f}')
+
+
+def bandingkan(hasil, path_baseline, toleransi, ambang_ms):
+    with open(path_baseline) as f:
+        baseline = json.load(f)['hasil']
+    regresi = []
+    print(f'\nDibanding baseline {path_baseline} (toleransi p95 {toleransi:.0f}%):')
+    for nama, h in hasil.items():
+        if nama not in baseline:
+            continue
+        lama = baseline[nama]['p95']
+        selisih = (h['p95'] - lama) / lama * 100 if lama else 0
+        # Rute yang sangat cepat mudah "regresi" dalam persen karena noise; wajibkan selisih absolut juga
+        buruk = selisih > toleransi and h['p95'] - lama > ambang_ms
+        print(f'  {nama:<15} p95 {lama:8.2f} -> {h["p95"]:8.2f} ms ({selisih:+6.1f}%) {"REGRESI" if buruk else "ok"}')
+        if buruk:
+            regresi.append(nama)
+    return regresi
+
+
+def bench_rute(args):
+    rng = random.Random(7)
+    path_db = args.db or os.path.join(args.folder, 'bench.db')
+    aplikasi = muat_aplikasi(path_db, args.page_cache)
+    isi_contoh(aplikasi, args.ukuran)
+    rute = daftar_rute(aplikasi, rng)
+    if args.rute:
+        rute = {k: v for k, v in rute.items() if k in args.rute}
+
+    if args.mode == 'gunicorn':
+        proses, url = mulai_gunicorn(path_db, args)
+        try:
+            hasil = jalankan_http(proses, url, rute, args)
+        finally:
+            proses.terminate()
+            proses.wait()
+    else:
+        hasil = jalankan_inproc(aplikasi, rute, args)
+
+    print(f'\nmode={args.mode} ukuran={args.ukuran} page_cache={args.page_cache}')
+    cetak(hasil)
+
+    if args.simpan_baseline:
+        with open(args.simpan_baseline, 'w') as f:
+            json.dump({'mode': args.mode, 'ukuran': args.ukuran, 'hasil': hasil}, f, indent=2)
+        print(f'\nBaseline disimpan ke {args.simpan_baseline}')
+    if args.baseline and bandingkan(hasil, args.baseline, args.toleransi, args.ambang_ms):
+        return 1
+    return 0
+
+
+def bench_hook(args):
+    # Bandingkan waktu request dengan biaya init_db() yang dulu dijalankan
+    # oleh @app.before_request di setiap request
+    aplikasi = muat_aplikasi(os.path.join(args.folder, 'bench.db'), args.page_cache)
+    isi_contoh(aplikasi, 50)
+    client = aplikasi.app.test_client()
+    client.get('/')
+
+    for path in ('/', '/berita/1', '/login'):
+        rata, median = ukur(lambda: client.get(path), args.request)
+        print(f'GET {path:<12} rata-rata {rata:7.3f} ms  median {median:7.3f} ms')
+
+    with aplikasi.app.test_request_context('/'):
+        rata, median = ukur(aplikasi.init_db, args.request)
+    print(f'init_db() per request (hook lama) rata-rata {rata:7.3f} ms  median {median:7.3f} ms')
+
+
+def bench_serving(args):
+    # Throughput rute baca dengan banyak koneksi bersamaan per kelas worker gunicorn
+    path_db = args.db or os.path.join(args.folder, 'bench.db')
+    aplikasi = muat_aplikasi(path_db, args.page_cache)
+    isi_contoh(aplikasi, args.ukuran)
+    rute = daftar_rute(aplikasi, random.Random(7))
+    rute = {k: v for k, v in rute.items() if k in (args.rute or ('index', 'detail', 'cari'))}
+
+    kelas = ['sync', 'gthread']
+    try:
+        import gevent  # noqa: F401
+        kelas.append('gevent')
+    except ImportError:
+        print('gevent tidak terpasang; mode gevent dilewati', file=sys.stderr)
+
+    print(f'worker={args.worker} threads={args.threads} konkurensi={args.konkurensi} ukuran={args.ukuran}')
+    print(f'{"kelas":<9}{"rute":<15}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for k in kelas:
+        args.worker_class = k
+        proses, url = mulai_gunicorn(path_db, args)
+        try:
+            hasil = jalankan_http(proses, url, rute, args)
+        finally:
+            proses.terminate()
+            proses.wait()
+        for nama, h in hasil.items():
+            print(f'{k:<9}{nama:<15}{h["rps"]:>10.1f}{h["p50"]:>10.2f}{h["p95"]:>10.2f}{h["p99"]:>10.2f}')
+
+
+def bench_kompresi(args):
+    # Byte di kabel dan biaya CPU kompresi per rute untuk setiap enkoding
+    import kompresi
+
+    aplikasi = muat_aplikasi(os.path.join(args.folder, 'bench.db') if not args.db else args.db, args.page_cache)
+    isi_contoh(aplikasi, args.ukuran)
+    rute = daftar_rute(aplikasi, random.Random(7))
+    rute = {k: v for k, v in rute.items() if k in (args.rute or ('index', 'cari', 'detail'))}
+    client = aplikasi.app.test_client()
+    enkoder = kompresi.daftar_enkoder(aplikasi.app.config['KOMPRESI_LEVEL_GZIP'])
+
+    print(f'{"rute":<10}{"enkoding":<10}{"byte":>9}{"rasio":>8}{"CPU ms":>9}{"MB/s":>9}')
+    for nama, buat in rute.items():
+        _, path, _ = buat()
+        body = client.get(path, headers={'Accept-Encoding': 'identity'}).get_data()
+        print(f'{nama:<10}{"identity":<10}{len(body):>9}{1:>8.2f}{0:>9.3f}{"-":>9}')
+        for enkoding, fungsi in enkoder:
+            mulai = time.process_time()
+            for _ in range(args.request):
+                hasil = fungsi(body)
+            cpu = (time.process_time() - mulai) / args.request
+            print(f'{nama:<10}{enkoding:<10}{len(hasil):>9}{len(body) / len(hasil):>8.2f}{cpu * 1000:>9.3f}'
+                  f'{len(body) / cpu / 1e6 if cpu else 0:>9.1f}')
+
+
+# -----------------------------------
+# KONKURENSI SQLITE (pembaca vs penulis)
+# -----------------------------------
+def _pekerja_konkurensi(peran, path_db, profil, detik, siap, mulai, antrian):
+    # Setiap pekerja adalah proses terpisah, seperti worker gunicorn
+    os.environ['SQLITE_PROFIL'] = profil
+    os.environ['AUTO_INIT_DB'] = '0'
+    aplikasi = muat_aplikasi(path_db)
+    rng = random.Random(os.getpid())
+    with aplikasi.app.app_context():
+        id_maks = aplikasi.db.session.query(aplikasi.db.func.max(aplikasi.Berita.id)).scalar() or 1
+        # Bukti profil benar-benar terpasang di koneksi pekerja
+        pragma = aplikasi.basisdata.pragma_aktif(aplikasi.db.engine)
+    client = aplikasi.app.test_client()
+    durasi, gagal = [], 0
+
+    siap.set()
+    mulai.wait()
+    batas = time.perf_counter() + detik
+    while time.perf_counter() < batas:
+        awal = time.perf_counter()
+        if peran == 'penulis':
+            with aplikasi.app.app_context():
+                try:
+                    aplikasi.db.session.add(aplikasi.Berita(**buat_berita(rng, 0)))
+                    aplikasi.db.session.commit()
+                except Exception:
+                    aplikasi.db.session.rollback()
+                    gagal += 1
+        else:
+            path = '/' if rng.random() < 0.5 else f'/berita/{rng.randint(1, id_maks)}'
+            if client.get(path).status_code >= 500:
+                gagal += 1
+        durasi.append((time.perf_counter() - awal) * 1000)
+    antrian.put((peran, durasi, gagal, pragma))
+
+
+def _salin_db(sumber, tujuan, profil):
+    # backup() juga menyalin isi WAL yang belum di-checkpoint
+    with sqlite3.connect(sumber) as asal, sqlite3.connect(tujuan) as salinan:
+        asal.backup(salinan)
+        salinan.execute('PRAGMA journal_mode=' + ('WAL' if profil == 'produksi' else 'DELETE'))
+
+
+def bench_konkurensi(args):
+    # Bandingkan throughput pembaca saat ada penulis yang terus commit,
+    # dengan profil SQLite bawaan (rollback journal) dan produksi (WAL)
+    path_dasar = args.db or os.path.join(args.folder, 'bench.db')
+    isi_contoh(muat_aplikasi(path_dasar), args.ukuran)
+    ctx = multiprocessing.get_context('spawn')
+
+    print(f'{"profil":<10}{"peran":<9}{"op/s":>9}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"gagal":>7}')
+    pragma_profil = {}
+    for profil in ('bawaan', 'produksi'):
+        path_db = os.path.join(args.folder, f'konkurensi-{profil}.db')
+        _salin_db(path_dasar, path_db, profil)
+        mulai, antrian = ctx.Event(), ctx.Queue()
+        peran = ['penulis'] * args.penulis + ['pembaca'] * args.pembaca
+        proses, tanda_siap = [], []
+        for p in peran:
+            siap = ctx.Event()
+            proses.append(ctx.Process(target=_pekerja_konkurensi,
+                                      args=(p, path_db, profil, args.durasi, siap, mulai, antrian)))
+            tanda_siap.append(siap)
+        for p in proses:
+            p.start()
+        for siap in tanda_siap:
+            siap.wait()
+        mulai.set()
+        hasil = [antrian.get() for _ in proses]
+        for p in proses:
+            p.join()
+
+        pragma_profil[profil] = hasil[0][3]
+        for nama in ('pembaca', 'penulis'):
+            durasi = [d for r, ds, _, _ in hasil if r == nama for d in ds]
+            gagal = sum(g for r, _, g, _ in hasil if r == nama)
+            if not durasi:
+                continue
+            h = ringkas(durasi, args.durasi)
+            print(f'{profil:<10}{nama:<9}{h["rps"]:>9.1f}{h["p50"]:>10.2f}{h["p95"]:>10.2f}'
+                  f'{h["p99"]:>10.2f}{gagal:>7}')
+
+    print('\nPRAGMA aktif di koneksi pekerja:')
+    for profil, pragma in pragma_profil.items():
+        print(f'  {profil:<10}' + ' '.join(f'{k}={v}' for k, v in pragma.items()))
+
+
+# -----------------------------------
+# MEMORI HALAMAN DAFTAR
+# -----------------------------------
+def _pekerja_memori(varian, path_db, args, antrian):
+    # Proses baru per varian supaya RSS satu varian tidak terbawa ke yang lain
+    os.environ['AUTO_INIT_DB'] = '0'
+    os.environ['BERITA_PER_HALAMAN'] = str(args.per_halaman)
+    aplikasi = muat_aplikasi(path_db)
+    if varian == 'isi':
+        # Perilaku sebelum kolom ringkasan: entitas Berita penuh, isi ikut dimuat untuk setiap kartu
+        from sqlalchemy.orm import undefer
+        aplikasi.KOLOM_KARTU = undefer(aplikasi.Berita.isi)
+    with aplikasi.app.app_context():
+        ids = aplikasi.db.session.scalars(aplikasi.db.select(aplikasi.Berita.id)).all()
+    rng = random.Random(11)
+    client = aplikasi.app.test_client()
+
+    def path():
+        return '/' if rng.random() < 0.3 else f'/?after={rng.choice(ids)}'
+
+    for _ in range(args.pemanasan):
+        client.get(path())
+    rss_awal = rss_mb()
+    puncak = []
+    tracemalloc.start()
+    for _ in range(args.request):
+        tracemalloc.reset_peak()
+        awal, _ = tracemalloc.get_traced_memory()
+        client.get(path())
+        puncak.append((tracemalloc.get_traced_memory()[1] - awal) / 1024)
+    tracemalloc.stop()
+    antrian.put((varian, rss_awal, rss_mb(), puncak))
+
+
+def bench_memori(args):
+    # Alokasi puncak Python per request beranda dan RSS proses: isi dimuat vs ringkasan saja
+    path_db = args.db or os.path.join(args.folder, 'bench.db')
+    isi_contoh(muat_aplikasi(path_db), args.ukuran)
+    ctx = multiprocessing.get_context('spawn')
+
+    print(f'{"varian":<11}{"alokasi p50 KB":>16}{"p95 KB":>10}{"RSS awal MB":>13}{"RSS akhir MB":>14}')
+    for varian in ('isi', 'ringkasan'):
+        antrian = ctx.Queue()
+        proses = ctx.Process(target=_pekerja_memori, args=(varian, path_db, args, antrian))
+        proses.start()
+        _, rss_awal, rss_akhir, puncak = antrian.get()
+        proses.join()
+        print(f'{varian:<11}{persentil(puncak, 50):>16.0f}{persentil(puncak, 95):>10.0f}'
+              f'{rss_awal:>13.1f}{rss_akhir:>14.1f}')
+
+
+SKENARIO = {
+    'hook': bench_hook,
+    'kompresi': bench_kompresi,
+    'konkurensi': bench_konkurensi,
+    'memori': bench_memori,
+    'rute': bench_rute,
+    'serving': bench_serving,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark portal berita')
+    parser.add_argument('skenario', choices=sorted(SKENARIO))
+    parser.add_argument('--request', type=int, default=300, help='jumlah request per pengukuran')
+    parser.add_argument('--pemanasan', type=int, default=20, help='request pemanasan per rute (tidak diukur)')
+    parser.add_argument('--ukuran', type=int, default=1000, help='jumlah berita sintetis (mis. 1000, 100000, 1000000)')
+    parser.add_argument('--db', help='file SQLite untuk korpus; dipakai ulang jika sudah berisi')
+    parser.add_argument('--page-cache', default='none', choices=('none', 'memory', 'filesystem'))
+    parser.add_argument('--rute', nargs='*', help='hanya ukur rute tertentu')
+    parser.add_argument('--mode', default='inproc', choices=('inproc', 'gunicorn'))
+    parser.add_argument('--worker', type=int, default=2, help='jumlah worker gunicorn')
+    parser.add_argument('--worker-class', help='kelas worker gunicorn (mis. gthread, gevent)')
+    parser.add_argument('--threads', type=int, default=8, help='thread per worker untuk kelas gthread')
+    parser.add_argument('--konkurensi', type=int, default=8, help='jumlah koneksi paralel (mode gunicorn)')
+    parser.add_argument('--pembaca', type=int, default=4, help='jumlah proses pembaca (skenario konkurensi)')
+    parser.add_argument('--penulis', type=int, default=1, help='jumlah proses penulis (skenario konkurensi)')
+    parser.add_argument('--per-halaman', type=int, default=12, help='berita per halaman beranda (skenario memori)')
+    parser.add_argument('--durasi', type=float, default=5.0, help='lama pengukuran per profil dalam detik (skenario konkurensi)')
+    parser.add_argument('--simpan-baseline', help='simpan hasil sebagai baseline JSON')
+    parser.add_argument('--baseline', help='bandingkan dengan baseline JSON; exit 1 jika p95 regresi')
+    parser.add_argument('--toleransi', type=float, default=20.0, help='batas regresi p95 dalam persen')
+    parser.add_argument('--ambang-ms', type=float, default=1.0, help='selisih p95 minimum (ms) agar dihitung regresi')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='bench-berita-') as folder:
+        args.folder = folder
+        return SKENARIO[args.skenario](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import gzip
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import brotli
+except ImportError:  # brotli opsional: tanpa brotli hanya varian .gz yang dibuat
+    brotli = None
+
+# -----------------------------------
+# TULIS FILE ATOMIK
+# -----------------------------------
+# Semua file yang bisa dibaca proses lain saat sedang ditulis (aset, snapshot,
+# feed, varian gambar, cache, checkpoint) ditulis ke file sementara di folder
+# yang sama lalu di-rename, jadi pembaca melihat versi lama atau versi baru
+# utuh, tidak pernah setengah jadi. File sementara berawalan titik dan selalu
+# dihapus jika penulisan gagal.
+
+
+@contextmanager
+def buka_atomik(path, mode='wb'):
+    """Context manager: file sementara yang menggantikan `path` jika blok selesai tanpa error."""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.tulis-')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def tulis_atomik(path, data):
+    with buka_atomik(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+
+
+def tulis_varian(path, data, lewati_ada=False):
+    """Tulis varian .gz/.br dari `data` di samping `path`; kembalikan akhiran yang ada.
+
+    Varian yang tidak lebih kecil dari aslinya tidak ditulis (dan sisa lamanya
+    dihapus). `lewati_ada` untuk file ber-hash isi: varian yang sudah ada pasti sama.
+    """
+    # mtime=0 supaya build ulang dengan isi sama menghasilkan byte yang sama
+    varian = {'.gz': lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        varian['.br'] = lambda: brotli.compress(data, quality=11)
+    ada = []
+    for akhiran, kompres in varian.items():
+        if lewati_ada and os.path.exists(path + akhiran):
+            ada.append(akhiran)
+            continue
+        isi = kompres()
+        if len(isi) < len(data):
+            tulis_atomik(path + akhiran, isi)
+            ada.append(akhiran)
+        elif os.path.exists(path + akhiran):
+            os.remove(path + akhiran)
+    return ada
@@ -0,0 +1,235 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+from berkas import buka_atomik
+
+# -----------------------------------
+# BACKEND CACHE
+# -----------------------------------
+# Setiap entri disimpan di bawah sebuah namespace (mis. 'index' atau
+# 'berita:12') supaya invalidasi bisa tepat sasaran: menghapus satu
+# namespace tidak menyentuh entri halaman lain.
+
+# Kunci environ WSGI: request yang membawanya dirender langsung tanpa cache
+# halaman (mis. render snapshot statis di ekspor.py)
+LEWATI_CACHE = 'berita.lewati_cache'
+
+
+def _nama_ns(ns):
+    return ns.replace(':', '-').replace(os.sep, '_')
+
+
+def penanda():
+    """Waktu (ns) untuk argumen `sejak` di set(); ambil SEBELUM membaca data yang akan di-cache.
+
+    Entri yang datanya dibaca sebelum invalidasi terakhir namespace-nya dianggap
+    basi, walaupun set() baru dipanggil setelah invalidasi itu.
+    """
+    return time.time_ns()
+
+
+def _baca_generasi(folder, ns):
+    if folder is None:
+        return 0
+    try:
+        return os.stat(os.path.join(folder, _nama_ns(ns))).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _cap_generasi(folder, ns):
+    if folder is None:
+        return
+    # mtime diset eksplisit (ns) supaya tidak bergantung pada resolusi jam filesystem
+    path = os.path.join(folder, _nama_ns(ns))
+    sekarang = time.time_ns()
+    with open(path, 'a'):
+        pass
+    os.utime(path, ns=(sekarang, sekarang))
+
+
+class _Statistik:
+    def __init__(self):
+        self.hit = 0
+        self.miss = 0
+
+    def _catat(self, nilai):
+        if nilai is None:
+            self.miss += 1
+        else:
+            self.hit += 1
+        return nilai
+
+    def statistik(self):
+        return {'backend': type(self).__name__, 'hit': self.hit, 'miss': self.miss}
+
+
+class MemoriCache(_Statistik):
+    """LRU in-process dengan TTL.
+
+    Dengan `folder_generasi`, hapus() juga mencap waktu namespace di file
+    bersama dan entri yang disimpan sebelum cap itu dianggap miss, jadi
+    invalidasi dari satu worker berlaku di worker lain tanpa menunggu TTL.
+    """
+
+    def __init__(self, maks=512, ttl=300, folder_generasi=None):
+        super().__init__()
+        self.maks = maks
+        self.ttl = ttl
+        self.folder_generasi = folder_generasi
+        self._data = OrderedDict()
+        self._kunci = threading.Lock()
+        if folder_generasi is not None:
+            os.makedirs(folder_generasi, exist_ok=True)
+
+    def get(self, ns, kunci):
+        generasi = _baca_generasi(self.folder_generasi, ns)
+        with self._kunci:
+            entri = self._data.get((ns, kunci))
+            if entri is not None:
+                kedaluwarsa, disimpan, nilai = entri
+                if kedaluwarsa > time.monotonic() and disimpan > generasi:
+                    self._data.move_to_end((ns, kunci))
+                    return self._catat(nilai)
+                del self._data[(ns, kunci)]
+            return self._catat(None)
+
+    def set(self, ns, kunci, nilai, sejak=None):
+        with self._kunci:
+            self._data[(ns, kunci)] = (time.monotonic() + self.ttl, sejak or penanda(), nilai)
+            self._data.move_to_end((ns, kunci))
+            while len(self._data) > self.maks:
+                self._data.popitem(last=False)
+
+    def hapus(self, ns, kunci=None):
+        # Cap per namespace: di worker lain seluruh namespace dianggap basi, juga untuk hapus satu kunci
+        _cap_generasi(self.folder_generasi, ns)
+        with self._kunci:
+            if kunci is not None:
+                self._data.pop((ns, kunci), None)
+                return
+            for k in [k for k in self._data if k[0] == ns]:
+                del self._data[k]
+
+    def statistik(self):
+        hasil = super().statistik()
+        hasil['entri'] = len(self._data)
+        return hasil
+
+
+class FileCache(_Statistik):
+    """Cache di filesystem, bisa dipakai bersama oleh beberapa worker.
+
+    hapus() juga mencap namespace di `.generasi/`, supaya set() dengan data
+    yang dibaca sebelum invalidasi itu (`sejak`) tidak menulis entri basi.
+    """
+
+    # Jumlah entri diperiksa setiap sekian set() per proses, bukan setiap kali
+    INTERVAL_RAPIKAN = 64
+
+    def __init__(self, folder, ttl=300, maks=512):
+        super().__init__()
+        self.folder = folder
+        self.ttl = ttl
+        self.maks = maks
+        self.folder_generasi = os.path.join(folder, '.generasi')
+        os.makedirs(self.folder_generasi, exist_ok=True)
+        self._tulis = 0
+        self._kunci = threading.Lock()
+
+    def _folder_ns(self, ns):
+        return os.path.join(self.folder, _nama_ns(ns))
+
+    def _path(self, ns, kunci):
+        nama = hashlib.sha1(kunci.encode('utf-8')).hexdigest()
+        return os.path.join(self._folder_ns(ns), nama)
+
+    def get(self, ns, kunci):
+        path = self._path(ns, kunci)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return self._catat(None)
+            with open(path, 'rb') as f:
+                return self._catat(pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return self._catat(None)
+
+    def set(self, ns, kunci, nilai, sejak=None):
+        if sejak is not None and sejak <= _baca_generasi(self.folder_generasi, ns):
+            return
+        with buka_atomik(self._path(ns, kunci)) as f:
+            pickle.dump(nilai, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._kunci:
+            self._tulis += 1
+            rapikan = self._tulis % self.INTERVAL_RAPIKAN == 0
+        if rapikan:
+            self.rapikan()
+
+    def rapikan(self):
+        """Hapus entri kedaluwarsa, lalu entri tertua sampai jumlahnya paling banyak `maks`."""
+        entri = []
+        batas = time.time() - self.ttl
+        for nama_ns in os.listdir(self.folder):
+            folder = os.path.join(self.folder, nama_ns)
+            if nama_ns.startswith('.') or not os.path.isdir(folder):
+                continue
+            for nama in os.listdir(folder):
+                path = os.path.join(folder, nama)
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                if mtime < batas:
+                    self._hapus_file(path)
+                else:
+                    entri.append((mtime, path))
+        if len(entri) > self.maks:
+            entri.sort()
+            for _, path in entri[:len(entri) - self.maks]:
+                self._hapus_file(path)
+
+    @staticmethod
+    def _hapus_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def hapus(self, ns, kunci=None):
+        _cap_generasi(self.folder_generasi, ns)
+        if kunci is not None:
+            try:
+                os.remove(self._path(ns, kunci))
+            except OSError:
+                pass
+            return
+        shutil.rmtree(self._folder_ns(ns), ignore_errors=True)
+
+
+class NullCache(_Statistik):
+    """Cache nonaktif: selalu miss."""
+
+    def get(self, ns, kunci):
+        return self._catat(None)
+
+    def set(self, ns, kunci, nilai, sejak=None):
+        pass
+
+    def hapus(self, ns, kunci=None):
+        pass
+
+
+def buat_cache(backend, maks=512, ttl=300, folder=None, folder_generasi=None):
+    if backend == 'memory':
+        return MemoriCache(maks=maks, ttl=ttl, folder_generasi=folder_generasi)
+    if backend == 'filesystem':
+        return FileCache(folder, ttl=ttl, maks=maks)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f'Backend cache tidak dikenal: {backend}')
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import shutil
+
+from berkas import tulis_atomik
+from basisdata import BACA_PRIMARY
+from cache import LEWATI_CACHE
+
+# -----------------------------------
+# EKSPOR SNAPSHOT STATIS
+# -----------------------------------
+# Halaman publik dirender lewat test client sebagai tamu (persis seperti yang
+# dilihat pembaca) lalu ditulis sebagai file HTML yang bisa dilayani file
+# server/CDN biasa:
+#   /                 -> index.html
+#   /?after=<id>      -> halaman/<n>/index.html (tautan di HTML ikut ditulis ulang)
+#   /berita/<id>      -> berita/<id>/index.html
+#   /static/...       -> static/... (hardlink jika bisa)
+#
+# Halaman daftar dihitung dari berita terlama: halaman n selalu berisi berita
+# urutan (n-1)*N .. n*N-1 (N = BERITA_PER_HALAMAN), dan index.html memuat sisanya
+# (N .. 2N-1 berita terbaru). Berita baru hanya mengubah index.html, sesekali
+# ditambah satu halaman penuh; halaman lama ditulis ulang hanya jika isinya
+# bergeser (berita dihapus/disembunyikan).
+POLA_HALAMAN = re.compile(r'href="/\?after=(\d+)"')
+PER_HALAMAN = 'ekspor.per_halaman'
+NAMA_MANIFEST = '.halaman.json'
+
+
+def _hapus_folder_kosong(folder):
+    try:
+        os.rmdir(folder)
+    except OSError:
+        pass
+
+
+class Pengekspor:
+    def __init__(self, app, folder, urutan):
+        """`urutan()` mengembalikan id berita terbit dari yang terlama, urut (created_at, id)."""
+        self.app = app
+        self.folder = folder
+        self.urutan = urutan
+
+    def _render(self, path, per_halaman=None):
+        # Tanpa Accept-Encoding: file ditulis apa adanya, kompresi urusan file server.
+        # Baca dari primary dan lewati cache halaman supaya snapshot tidak pernah basi.
+        environ = {BACA_PRIMARY: True, LEWATI_CACHE: True}
+        if per_halaman:
+            environ[PER_HALAMAN] = per_halaman
+        resp = self.app.test_client().get(path, environ_base=environ)
+        return resp.get_data() if resp.status_code == 200 else None
+
+    def _pembagian(self):
+        # (N, id urut dari terlama, jumlah halaman penuh di luar index.html)
+        n = self.app.config['BERITA_PER_HALAMAN']
+        ids = list(self.urutan())
+        return n, ids, max(0, len(ids) // n - 1)
+
+    def _tulis_halaman(self, path, tujuan, nomor, per_halaman=None):
+        html = self._render(path, per_halaman)
+        if html is None:
+            return False
+        teks = POLA_HALAMAN.sub(lambda m: f'href="/halaman/{nomor[m.group(1)]}/"' if m.group(1) in nomor
+                                else m.group(0), html.decode('utf-8'))
+        tulis_atomik(os.path.join(self.folder, tujuan), teks.encode('utf-8'))
+        return True
+
+    def _muat_manifest(self):
+        try:
+            with open(os.path.join(self.folder, 'halaman', NAMA_MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def daftar(self, paksa=False):
+        """Ekspor index.html dan halaman penuh yang isinya berubah; kembalikan nomor halaman yang ada.
+
+        Isi tiap halaman dicatat di manifest; `paksa` merender ulang semuanya (mis. template berubah).
+        """
+        n, ids, penuh = self._pembagian()
+        # Tautan "berikutnya" halaman k+1 (dan index.html) berkursor id pertama sesudah halaman k
+        nomor = {str(ids[k * n]): k for k in range(1, penuh + 1)}
+        self._tulis_halaman('/', 'index.html', nomor, per_halaman=len(ids) - penuh * n)
+
+        lama = {} if paksa else self._muat_manifest()
+        manifest = {}
+        for k in range(1, penuh + 1):
+            isi = ids[(k - 1) * n:k * n]
+            tujuan = os.path.join('halaman', str(k), 'index.html')
+            if lama.get(str(k)) != isi or not os.path.exists(os.path.join(self.folder, tujuan)):
+                if not self._tulis_halaman(f'/?after={ids[k * n]}', tujuan, nomor):
+                    continue
+            manifest[str(k)] = isi
+
+        # Halaman di luar 1..penuh: berita dihapus, atau folder bernama kursor dari versi lama
+        folder_halaman = os.path.join(self.folder, 'halaman')
+        if os.path.isdir(folder_halaman):
+            for nama in os.listdir(folder_halaman):
+                if nama != NAMA_MANIFEST and nama not in manifest:
+                    shutil.rmtree(os.path.join(folder_halaman, nama), ignore_errors=True)
+        if manifest:
+            tulis_atomik(os.path.join(folder_halaman, NAMA_MANIFEST), json.dumps(manifest).encode('utf-8'))
+        elif os.path.isdir(folder_halaman):
+            shutil.rmtree(folder_halaman, ignore_errors=True)
+        return sorted(manifest, key=int)
+
+    def halaman_berisi(self, id):
+        """Tulis ulang halaman penuh yang memuat berita `id` (mis. setelah gambar atau judulnya berubah)."""
+        n, ids, penuh = self._pembagian()
+        try:
+            k = ids.index(id) // n + 1
+        except ValueError:
+            return False
+        if k > penuh:
+            return False  # ada di index.html, ditulis oleh daftar()
+        nomor = {str(ids[j * n]): j for j in range(1, penuh + 1)}
+        return self._tulis_halaman(f'/?after={ids[k * n]}', os.path.join('halaman', str(k), 'index.html'), nomor)
+
+    def berita(self, id):
+        tujuan = os.path.join(self.folder, 'berita', str(id), 'index.html')
+        html = self._render(f'/berita/{id}')
+        if html is None:
+            # Berita sudah dihapus
+            if os.path.exists(tujuan):
+                os.remove(tujuan)
+            _hapus_folder_kosong(os.path.dirname(tujuan))
+            return False
+        tulis_atomik(tujuan, html)
+        return True
+
+    def static(self):
+        """Samakan salinan static/ dengan aslinya: tambah file baru, hapus yang sudah tidak ada."""
+        asal = self.app.static_folder
+        tujuan_akar = os.path.join(self.folder, 'static')
+        ada = set()
+        for akar, _, file in os.walk(asal):
+            relatif_akar = os.path.relpath(akar, asal)
+            for nama in file:
+                if nama.startswith('.'):
+                    continue
+                relatif = os.path.normpath(os.path.join(relatif_akar, nama))
+                ada.add(relatif)
+                sumber, tujuan = os.path.join(asal, relatif), os.path.join(tujuan_akar, relatif)
+                if os.path.exists(tujuan) and os.path.getmtime(tujuan) >= os.path.getmtime(sumber):
+                    continue
+                os.makedirs(os.path.dirname(tujuan), exist_ok=True)
+                if os.path.exists(tujuan):
+                    os.remove(tujuan)
+                try:
+                    os.link(sumber, tujuan)
+                except OSError:
+                    shutil.copy2(sumber, tujuan)
+        for akar, _, file in os.walk(tujuan_akar, topdown=False):
+            for nama in file:
+                relatif = os.path.normpath(os.path.join(os.path.relpath(akar, tujuan_akar), nama))
+                if relatif not in ada:
+                    os.remove(os.path.join(akar, nama))
+            _hapus_folder_kosong(akar)
+
+    def semua(self, semua_id):
+        """Ekspor penuh; berita yang tidak ada di `semua_id` dihapus dari snapshot."""
+        os.makedirs(self.folder, exist_ok=True)
+        self.static()
+        halaman = self.daftar(paksa=True)
+        ditulis = {str(id) for id in semua_id if self.berita(id)}
+        folder_berita = os.path.join(self.folder, 'berita')
+        if os.path.isdir(folder_berita):
+            for nama in os.listdir(folder_berita):
+                if nama not in ditulis:
+                    shutil.rmtree(os.path.join(folder_berita, nama), ignore_errors=True)
+        return len(halaman) + 1, len(ditulis)
@@ -0,0 +1,134 @@
+import json
+import os
+
+import penyimpanan
+from berkas import buka_atomik, tulis_atomik
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow opsional: tanpa Pillow hanya file asli yang dipakai
+    Image = None
+
+# -----------------------------------
+# VARIAN GAMBAR RESPONSIF
+# -----------------------------------
+# Lebar (px) setiap varian. Gambar tidak diperbesar: varian yang melebihi lebar
+# asli dibuat selebar aslinya dan diberi nama serta deskriptor `w` lebar itu.
+# Lebar yang benar-benar dibuat dicatat di file catatan `<stem>-varian.json`.
+LEBAR_VARIAN = (320, 640, 1280)
+
+# (ekstensi, format Pillow, MIME, opsi simpan); urutan = prioritas <source>
+FORMAT_VARIAN = (
+    ('avif', 'AVIF', 'image/avif', {'quality': 55}),
+    ('webp', 'WEBP', 'image/webp', {'quality': 78, 'method': 4}),
+    ('jpg', 'JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def aktif():
+    return Image is not None
+
+
+def _format_didukung():
+    hasil = []
+    for ext, fmt, mime, opsi in FORMAT_VARIAN:
+        if fmt == 'JPEG' or features.check(ext):
+            hasil.append((ext, fmt, mime, opsi))
+    return hasil
+
+
+def nama_varian(gambar, lebar, ext):
+    stem, _ = os.path.splitext(gambar)
+    return f'{stem}-{lebar}.{ext}'
+
+
+def nama_catatan(gambar):
+    stem, _ = os.path.splitext(gambar)
+    return f'{stem}-varian.json'
+
+
+def baca_catatan(folder, gambar):
+    """{'lebar': [...], 'format': [...]} varian yang sudah selesai dibuat, atau None."""
+    try:
+        with open(os.path.join(folder, nama_catatan(gambar))) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def buat_varian(folder, gambar):
+    if not aktif():
+        return []
+
+    with Image.open(os.path.join(folder, gambar)) as asli:
+        # Terapkan orientasi EXIF dulu, karena metadata tidak ikut disimpan ulang
+        img = ImageOps.exif_transpose(asli)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+        img.load()
+
+    if img.mode == 'RGBA':
+        # JPEG tidak punya alpha: tempel di atas latar putih
+        rgb = Image.new('RGB', img.size, (255, 255, 255))
+        rgb.paste(img, mask=img.getchannel('A'))
+    else:
+        rgb = img
+
+    format_didukung = _format_didukung()
+    dibuat, lebar_dibuat = [], []
+    for lebar in LEBAR_VARIAN:
+        # Tidak memperbesar gambar: berhenti di varian pertama yang >= lebar asli
+        skala = min(1.0, lebar / img.width)
+        ukuran = (max(1, round(img.width * skala)), max(1, round(img.height * skala)))
+        for ext, fmt, _, opsi in format_didukung:
+            sumber = rgb if fmt == 'JPEG' else img
+            hasil = sumber.resize(ukuran, Image.LANCZOS) if skala < 1 else sumber
+            nama = nama_varian(gambar, ukuran[0], ext)
+            with buka_atomik(os.path.join(folder, nama)) as f:
+                hasil.save(f, fmt, **opsi)
+            dibuat.append(nama)
+        lebar_dibuat.append(ukuran[0])
+        if skala == 1.0:
+            break
+
+    # Varian bernama lebar nominal dari versi lama yang sebenarnya lebih sempit
+    for lebar in LEBAR_VARIAN:
+        if lebar not in lebar_dibuat:
+            for ext, _, _, _ in FORMAT_VARIAN:
+                penyimpanan.hapus(folder, nama_varian(gambar, lebar, ext))
+
+    # Catatan ditulis terakhir: srcset baru memakai varian setelah semuanya selesai
+    catatan = {'lebar': lebar_dibuat, 'format': [ext for ext, _, _, _ in format_didukung]}
+    tulis_atomik(os.path.join(folder, nama_catatan(gambar)), json.dumps(catatan))
+    return dibuat
+
+
+def hapus_varian(folder, gambar):
+    catatan = baca_catatan(folder, gambar) or {}
+    for lebar in set(LEBAR_VARIAN) | set(catatan.get('lebar', ())):
+        for ext, _, _, _ in FORMAT_VARIAN:
+            penyimpanan.hapus(folder, nama_varian(gambar, lebar, ext))
+    penyimpanan.hapus(folder, nama_catatan(gambar))
+
+
+def srcset(folder, gambar, url):
+    # Hanya varian yang sudah selesai dibuat yang dimasukkan ke srcset
+    catatan = baca_catatan(folder, gambar)
+    sumber = []
+    fallback = None
+    for ext, _, mime, _ in FORMAT_VARIAN:
+        bagian = []
+        if catatan is not None:
+            ada = catatan['lebar'] if ext in catatan['format'] else []
+        else:
+            # Varian lama tanpa catatan: periksa file bernama lebar nominal
+            ada = [lebar for lebar in LEBAR_VARIAN
+                   if os.path.exists(os.path.join(folder, nama_varian(gambar, lebar, ext)))]
+        for lebar in ada:
+            nama = nama_varian(gambar, lebar, ext)
+            bagian.append(f'{url(nama)} {lebar}w')
+            if ext == 'jpg' and (fallback is None or lebar <= 640):
+                fallback = url(nama)
+        if bagian:
+            sumber.append((mime, ', '.join(bagian)))
+    return {'sumber': sumber, 'src': fallback or url(gambar)}
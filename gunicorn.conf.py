@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+# -----------------------------------
+# KONFIGURASI GUNICORN
+# -----------------------------------
+# Dibaca otomatis oleh `gunicorn app:app` dari folder ini. WORKER_MODE:
+#   sync    - satu request per worker; klien/query lambat memarkir seluruh worker
+#   gthread - beberapa thread per worker; sqlite3 & driver DB melepas GIL saat
+#             menunggu, jadi query lambat hanya memarkir satu thread (disarankan)
+#   gevent  - greenlet, untuk banyak koneksi lambat/keep-alive. Butuh `gevent`;
+#             hanya non-blocking dengan driver yang bisa di-patch (psycopg2 +
+#             psycogreen). Panggilan SQLite tetap memblok seluruh worker.
+worker_mode = os.environ.get('WORKER_MODE', 'sync')
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+if worker_mode == 'gthread':
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 8))
+    keepalive = 5
+    # Setiap thread butuh koneksi sendiri; jangan sampai menunggu pool
+    os.environ.setdefault('DB_POOL_SIZE', str(threads))
+elif worker_mode == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('GUNICORN_KONEKSI', 1000))
+    keepalive = 5
+elif worker_mode != 'sync':
+    raise RuntimeError(f'WORKER_MODE tidak dikenal: {worker_mode}')
+
+
+def post_fork(server, worker):
+    if worker_mode != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning('psycogreen tidak terpasang: query database memblok worker gevent')
+    else:
+        patch_psycopg()
+
+
+def post_worker_init(worker):
+    # Pekerja antrian mode `thread` dimulai begitu worker memuat aplikasi, tanpa menunggu
+    # request pertama, supaya job yang menunggu (dari CLI, retry, restart) tetap jalan
+    aplikasi = sys.modules.get('app')
+    if aplikasi is not None and hasattr(aplikasi, 'antrian_job'):
+        aplikasi.antrian_job.mulai_pekerja_lokal()
+
+
+def on_starting(server):
+    # Skema & migrasi dijalankan sekali di master sebelum worker di-fork, lewat proses
+    # terpisah supaya master tidak ikut memuat aplikasi. Worker mewarisi AUTO_INIT_DB=0.
+    if os.environ.get('AUTO_INIT_DB', '1') != '1':
+        return
+    # AUTO_INIT_DB=0 untuk subproses: import app tidak ikut menjalankan init_db() sebelum perintahnya
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'],
+                   cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+                   env={**os.environ, 'AUTO_INIT_DB': '0'})
+    os.environ['AUTO_INIT_DB'] = '0'
@@ -0,0 +1,343 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_request_context, request, request_finished, request_started
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# -----------------------------------
+# INSTRUMENTASI PER REQUEST
+# -----------------------------------
+# Mencatat waktu SQL, render template, dan hook untuk setiap request, lalu
+# menampilkannya di header Server-Timing dan endpoint /metrics (format
+# Prometheus). Metrik disimpan per proses: dengan beberapa worker gunicorn,
+# setiap worker melaporkan angkanya sendiri.
+BUCKET_DETIK = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _MetrikRute:
+    def __init__(self):
+        self.jumlah = 0
+        self.detik = 0.0
+        self.sql_jumlah = 0
+        self.sql_detik = 0.0
+        self.template_detik = 0.0
+        self.hook_detik = 0.0
+        self.bucket = [0] * len(BUCKET_DETIK)
+
+
+class Instrumentasi:
+    def __init__(self, app=None):
+        self.aktif = False
+        self._metrik = {}
+        self._gauge = []
+        self._kunci = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.aktif = app.config.get('INSTRUMENTASI', False)
+        if not self.aktif:
+            return
+
+        self.sampel_profil = app.config.get('PROFIL_SAMPEL', 0.0)
+        self.ambang_lambat = app.config.get('PROFIL_AMBANG_MS', 500) / 1000
+        self.folder_profil = app.config.get('PROFIL_DIR')
+
+        event.listen(Engine, 'before_cursor_execute', self._sql_mulai)
+        event.listen(Engine, 'after_cursor_execute', self._sql_selesai)
+        before_render_template.connect(self._template_mulai, app)
+        template_rendered.connect(self._template_selesai, app)
+        request_started.connect(self._request_mulai, app)
+        request_finished.connect(self._request_selesai, app)
+
+        # dispatch_request (pemanggilan view) diukur terpisah supaya sisa waktu
+        # request bisa dihitung sebagai overhead hook before/after_request
+        app.dispatch_request = self._bungkus_dispatch(app.dispatch_request)
+
+    def gauge(self, nama, keterangan, fungsi):
+        """Daftarkan metrik tambahan; fungsi mengembalikan angka atau dict {label: angka}."""
+        self._gauge.append((nama, keterangan, fungsi))
+
+    # ----- pencatatan per request -----
+    def _catatan(self):
+        if has_request_context():
+            return g.get('_instrumentasi')
+        return None
+
+    def _request_mulai(self, sender, **extra):
+        g._instrumentasi = catatan = {
+            'mulai': time.perf_counter(),
+            'view': 0.0,
+            'sql_jumlah': 0,
+            'sql_detik': 0.0,
+            'sql_terlambat': (0.0, None),
+            'template_detik': 0.0,
+            'template_stack': [],
+            'span': {},
+        }
+        if self.sampel_profil and random.random() < self.sampel_profil:
+            catatan['profil'] = cProfile.Profile()
+            catatan['profil'].enable()
+
+    def _bungkus_dispatch(self, dispatch):
+        @wraps(dispatch)
+        def wrapper():
+            catatan = self._catatan()
+            if catatan is None:
+                return dispatch()
+            mulai = time.perf_counter()
+            try:
+                return dispatch()
+            finally:
+                catatan['view'] += time.perf_counter() - mulai
+        return wrapper
+
+    def _sql_mulai(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_instrumentasi_mulai', []).append(time.perf_counter())
+
+    def _sql_selesai(self, conn, cursor, statement, parameters, context, executemany):
+        durasi = time.perf_counter() - conn.info['_instrumentasi_mulai'].pop()
+        catatan = self._catatan()
+        if catatan is None:
+            return
+        catatan['sql_jumlah'] += 1
+        catatan['sql_detik'] += durasi
+        if durasi > catatan['sql_terlambat'][0]:
+            catatan['sql_terlambat'] = (durasi, statement)
+
+    def _template_mulai(self, sender, template, context, **extra):
+        catatan = self._catatan()
+        if catatan is not None:
+            catatan['template_stack'].append(time.perf_counter())
+
+    def _template_selesai(self, sender, template, context, **extra):
+        catatan = self._catatan()
+        if catatan is not None and catatan['template_stack']:
+            catatan['template_detik'] += time.perf_counter() - catatan['template_stack'].pop()
+
+    @contextmanager
+    def ukur(self, nama):
+        """Catat durasi sebuah blok kode sebagai span tersendiri di Server-Timing."""
+        catatan = self._catatan() if self.aktif else None
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            if catatan is not None:
+                catatan['span'][nama] = catatan['span'].get(nama, 0.0) + time.perf_counter() - mulai
+
+    def _request_selesai(self, sender, response, **extra):
+        catatan = self._catatan()
+        if catatan is None:
+            return
+        total = time.perf_counter() - catatan['mulai']
+        hook = max(0.0, total - catatan['view'])
+        endpoint = request.endpoint or 'tidak_dikenal'
+
+        timing = [
+            f'db;dur={catatan["sql_detik"] * 1000:.2f};desc="{catatan["sql_jumlah"]} query"',
+            f'tpl;dur={catatan["template_detik"] * 1000:.2f}',
+            f'hook;dur={hook * 1000:.2f}',
+        ]
+        timing += [f'{nama};dur={detik * 1000:.2f}' for nama, detik in catatan['span'].items()]
+        timing.append(f'total;dur={total * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(timing)
+
+        with self._kunci:
+            m = self._metrik.setdefault(endpoint, _MetrikRute())
+            m.jumlah += 1
+            m.detik += total
+            m.sql_jumlah += catatan['sql_jumlah']
+            m.sql_detik += catatan['sql_detik']
+            m.template_detik += catatan['template_detik']
+            m.hook_detik += hook
+            for i, batas in enumerate(BUCKET_DETIK):
+                if total <= batas:
+                    m.bucket[i] += 1
+
+        profil = catatan.get('profil')
+        if profil is not None:
+            profil.disable()
+        if total >= self.ambang_lambat:
+            detik_sql, sql = catatan['sql_terlambat']
+            self.app.logger.warning(
+                'Request lambat %s %s: %.1f ms (SQL %d query %.1f ms, template %.1f ms, hook %.1f ms); '
+                'query terlambat %.1f ms: %s',
+                request.method, request.full_path, total * 1000, catatan['sql_jumlah'],
+                catatan['sql_detik'] * 1000, catatan['template_detik'] * 1000, hook * 1000,
+                detik_sql * 1000, ' '.join((sql or '-').split()),
+            )
+            if profil is not None and self.folder_profil:
+                os.makedirs(self.folder_profil, exist_ok=True)
+                nama = f'{int(time.time() * 1000)}-{endpoint}-{total * 1000:.0f}ms.prof'
+                profil.dump_stats(os.path.join(self.folder_profil, nama))
+
+    # ----- ekspor Prometheus -----
+    def prometheus(self):
+        baris = []
+
+        def tulis(nama, jenis, keterangan, nilai):
+            baris.append(f'# HELP {nama} {keterangan}')
+            baris.append(f'# TYPE {nama} {jenis}')
+            baris.extend(nilai)
+
+        with self._kunci:
+            metrik = sorted(self._metrik.items())
+            tulis('berita_request_total', 'counter', 'Jumlah request per route',
+                  [f'berita_request_total{{route="{r}"}} {m.jumlah}' for r, m in metrik])
+            histogram = []
+            for r, m in metrik:
+                for batas, n in zip(BUCKET_DETIK, m.bucket):
+                    histogram.append(f'berita_request_seconds_bucket{{route="{r}",le="{batas}"}} {n}')
+                histogram.append(f'berita_request_seconds_bucket{{route="{r}",le="+Inf"}} {m.jumlah}')
+                histogram.append(f'berita_request_seconds_sum{{route="{r}"}} {m.detik:.6f}')
+                histogram.append(f'berita_request_seconds_count{{route="{r}"}} {m.jumlah}')
+            tulis('berita_request_seconds', 'histogram', 'Durasi request per route', histogram)
+            tulis('berita_sql_queries_total', 'counter', 'Jumlah query SQL per route',
+                  [f'berita_sql_queries_total{{route="{r}"}} {m.sql_jumlah}' for r, m in metrik])
+            tulis('berita_sql_seconds_total', 'counter', 'Total waktu SQL per route',
+                  [f'berita_sql_seconds_total{{route="{r}"}} {m.sql_detik:.6f}' for r, m in metrik])
+            tulis('berita_template_seconds_total', 'counter', 'Total waktu render template per route',
+                  [f'berita_template_seconds_total{{route="{r}"}} {m.template_detik:.6f}' for r, m in metrik])
+            tulis('berita_hook_seconds_total', 'counter', 'Total waktu hook request per route',
+                  [f'berita_hook_seconds_total{{route="{r}"}} {m.hook_detik:.6f}' for r, m in metrik])
+
+        for nama, keterangan, fungsi in self._gauge:
+            nilai = fungsi()
+            if isinstance(nilai, dict):
+                tulis(nama, 'gauge', keterangan,
+                      [f'{nama}{{{label}}} {angka}' for label, angka in sorted(nilai.items())])
+            else:
+                tulis(nama, 'gauge', keterangan, [f'{nama} {nilai}'])
+        return '\n'.join(baris) + '\n'
+
+
+# -----------------------------------
+# DETEKSI N+1 & QUERY DUPLIKAT
+# -----------------------------------
+# Mode pengembangan/test: hitung query per request, tandai statement yang
+# identik (SQL + parameter sama) dan pola N+1 (SQL sama, parameter berbeda,
+# berulang banyak kali), serta periksa anggaran query per route.
+_penghitung_aktif = threading.local()
+_listener_terpasang = False
+
+
+def _bekukan(parameters):
+    if isinstance(parameters, dict):
+        return tuple(sorted(parameters.items()))
+    if isinstance(parameters, (list, tuple)):
+        return tuple(_bekukan(p) if isinstance(p, (list, tuple, dict)) else p for p in parameters)
+    return parameters
+
+
+def _catat_statement(conn, cursor, statement, parameters, context, executemany):
+    for penghitung in getattr(_penghitung_aktif, 'stack', ()):
+        penghitung.statement.append((' '.join(statement.split()), _bekukan(parameters)))
+
+
+def _pasang_listener():
+    global _listener_terpasang
+    if not _listener_terpasang:
+        event.listen(Engine, 'before_cursor_execute', _catat_statement)
+        _listener_terpasang = True
+
+
+class PenghitungQuery:
+    def __init__(self):
+        self.statement = []
+
+    @property
+    def jumlah(self):
+        return len(self.statement)
+
+    def duplikat(self):
+        """Statement yang dieksekusi lebih dari sekali dengan parameter yang sama."""
+        hitung = {}
+        for item in self.statement:
+            hitung[item] = hitung.get(item, 0) + 1
+        return {sql: n for (sql, _), n in hitung.items() if n > 1}
+
+    def berulang(self, ambang):
+        """SQL yang sama dengan parameter berbeda >= ambang kali: ciri khas lazy load N+1."""
+        variasi = {}
+        for sql, parameter in self.statement:
+            variasi.setdefault(sql, set()).add(parameter)
+        return {sql: len(p) for sql, p in variasi.items() if len(p) >= ambang}
+
+    def ringkasan(self):
+        return '\n'.join(f'  {i + 1}. {sql} {parameter}' for i, (sql, parameter) in enumerate(self.statement))
+
+
+@contextmanager
+def hitung_query():
+    """Hitung semua query yang dieksekusi thread ini selama blok berjalan."""
+    _pasang_listener()
+    penghitung = PenghitungQuery()
+    stack = _penghitung_aktif.__dict__.setdefault('stack', [])
+    stack.append(penghitung)
+    try:
+        yield penghitung
+    finally:
+        stack.remove(penghitung)
+
+
+def anggaran_query(maks):
+    """Tandai jumlah query maksimum sebuah route; diperiksa oleh DeteksiQuery dan `flask audit-query`."""
+    def dekorator(view):
+        view.anggaran_query = maks
+        return view
+    return dekorator
+
+
+class DeteksiQuery:
+    def __init__(self, app=None):
+        self.aktif = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.aktif = app.config.get('DETEKSI_QUERY', False)
+        if not self.aktif:
+            return
+        self.ambang = app.config.get('DETEKSI_QUERY_AMBANG', 5)
+        self.ketat = app.config.get('DETEKSI_QUERY_KETAT', False)
+        _pasang_listener()
+        request_started.connect(self._mulai, app)
+        request_finished.connect(self._selesai, app)
+
+    def _mulai(self, sender, **extra):
+        blok = hitung_query()
+        g._deteksi_query = (blok, blok.__enter__())
+
+    def _selesai(self, sender, response, **extra):
+        blok, penghitung = g.pop('_deteksi_query', (None, None))
+        if blok is None:
+            return
+        blok.__exit__(None, None, None)
+        response.headers['X-Query-Count'] = str(penghitung.jumlah)
+
+        masalah = []
+        for sql, n in penghitung.duplikat().items():
+            masalah.append(f'query duplikat {n}x: {sql}')
+        for sql, n in penghitung.berulang(self.ambang).items():
+            masalah.append(f'kemungkinan N+1 ({n} variasi parameter): {sql}')
+        view = self.app.view_functions.get(request.endpoint)
+        maks = getattr(view, 'anggaran_query', None)
+        if maks is not None and penghitung.jumlah > maks:
+            masalah.append(f'anggaran query terlampaui: {penghitung.jumlah} > {maks}')
+
+        if not masalah:
+            return
+        pesan = f'{request.method} {request.full_path}: ' + '; '.join(masalah)
+        if self.ketat:
+            raise AssertionError(pesan + '\n' + penghitung.ringkasan())
+        self.app.logger.warning(pesan)
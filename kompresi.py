@@ -0,0 +1,104 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli & zstandard opsional: gzip selalu tersedia
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# -----------------------------------
+# KOMPRESI RESPONSE
+# -----------------------------------
+# Body teks (HTML, JSON, dst.) dikompres sesuai Accept-Encoding klien. Media
+# yang sudah terkompresi, body kecil, dan response file (send_file, termasuk
+# aset dist yang sudah punya .gz/.br sendiri) dilewati.
+MIME_KOMPRES = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                'application/rss+xml', 'application/atom+xml', 'image/svg+xml')
+
+
+def daftar_enkoder(level_gzip=6):
+    """[(nama enkoding, fungsi kompres)] yang tersedia, urut prioritas server."""
+    enkoder = []
+    if brotli is not None:
+        # Kualitas 5: rasio mendekati 11 dengan CPU jauh lebih kecil untuk HTML dinamis
+        enkoder.append(('br', lambda data: brotli.compress(data, quality=5)))
+    if zstandard is not None:
+        enkoder.append(('zstd', zstandard.ZstdCompressor(level=3).compress))
+    enkoder.append(('gzip', lambda data: gzip.compress(data, compresslevel=level_gzip, mtime=0)))
+    return enkoder
+
+
+def pilih(enkoder, accept_encodings):
+    for nama, fungsi in enkoder:
+        if accept_encodings[nama] > 0:
+            return nama, fungsi
+    return None
+
+
+def dapat_dikompres(resp, min_byte):
+    if resp.status_code < 200 or resp.status_code >= 300 or resp.status_code == 204:
+        return False
+    if resp.direct_passthrough or resp.is_streamed or 'Content-Encoding' in resp.headers:
+        return False
+    if not (resp.mimetype or '').startswith(MIME_KOMPRES):
+        return False
+    return (resp.calculate_content_length() or 0) >= min_byte
+
+
+class Kompresi:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.aktif = app.config.get('KOMPRESI', True)
+        self.min_byte = app.config.get('KOMPRESI_MIN_BYTE', 1024)
+        self.enkoder = daftar_enkoder(app.config.get('KOMPRESI_LEVEL_GZIP', 6))
+        if self.aktif:
+            app.after_request(self.kompres)
+
+    def kompres(self, resp):
+        if resp.status_code == 304:
+            # 304 harus membawa ETag yang sama dengan 200 yang akan dikirim. Hanya
+            # cache_halaman yang menandai 304-nya (`ukuran_body`, None jika belum
+            # diketahui); 304 lain (send_file, feed, aset) tidak pernah dikompres.
+            if not hasattr(resp, 'ukuran_body'):
+                return resp
+            resp.vary.add('Accept-Encoding')
+            ukuran = resp.ukuran_body
+            if (ukuran is None or ukuran >= self.min_byte) and pilih(self.enkoder, request.accept_encodings):
+                _lemahkan_etag(resp)
+            return resp
+        if not dapat_dikompres(resp, self.min_byte):
+            return resp
+        # Representasi berbeda per enkoding, jadi cache perantara harus membedakannya
+        resp.vary.add('Accept-Encoding')
+        pilihan = pilih(self.enkoder, request.accept_encodings)
+        if pilihan is None:
+            return resp
+        nama, fungsi = pilihan
+
+        # cache_halaman menyimpan varian terkompresi bersama entri halaman
+        varian = getattr(resp, 'varian_kompresi', None) or {}
+        data = varian.get(nama)
+        if data is None:
+            data = fungsi(resp.get_data())
+            simpan = getattr(resp, 'simpan_varian', None)
+            if simpan is not None:
+                simpan(nama, data)
+        resp.set_data(data)
+        resp.headers['Content-Encoding'] = nama
+        _lemahkan_etag(resp)
+        return resp
+
+
+def _lemahkan_etag(resp):
+    # Byte berbeda dari versi identity: ETag kuat jadi lemah (RFC 9110 8.8.1)
+    etag, lemah = resp.get_etag()
+    if etag and not lemah:
+        resp.set_etag(etag, weak=True)
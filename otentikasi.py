@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as WaktuHabis
+
+from flask_login import UserMixin
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# -----------------------------------
+# HASH PASSWORD DI POOL TERBATAS
+# -----------------------------------
+# pbkdf2/scrypt memakan ratusan ms CPU. Hashing dijalankan di pool kecil
+# (hashlib melepas GIL), sehingga lonjakan login paling banyak memakai
+# `maks_worker` core per proses. Jika antrian penuh (atau hash tidak selesai
+# dalam `timeout` detik), request ditolak dengan cepat alih-alih ikut mengantri
+# dan menahan worker yang melayani pembaca.
+
+
+class AntrianPenuh(Exception):
+    pass
+
+
+class PoolHash:
+    def __init__(self, metode, maks_worker=2, maks_antrian=16, timeout=10):
+        self.metode = metode
+        self.maks_antrian = maks_antrian
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=maks_worker, thread_name_prefix='hash')
+        self._kunci = threading.Lock()
+        self._antri = 0
+        self._awalan = None
+
+    @property
+    def antri(self):
+        return self._antri
+
+    def _jalankan(self, fungsi, *args):
+        with self._kunci:
+            if self._antri >= self.maks_antrian:
+                raise AntrianPenuh()
+            self._antri += 1
+        try:
+            future = self._pool.submit(fungsi, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except WaktuHabis:
+                future.cancel()
+                raise AntrianPenuh() from None
+        finally:
+            with self._kunci:
+                self._antri -= 1
+
+    def buat(self, password):
+        return self._jalankan(generate_password_hash, password, self.metode)
+
+    def cocok(self, hash_tersimpan, password):
+        return self._jalankan(check_password_hash, hash_tersimpan, password)
+
+    def perlu_rehash(self, hash_tersimpan):
+        # Awalan hash memuat metode & parameternya, mis. `pbkdf2:sha256:1000000`
+        if self._awalan is None:
+            self._awalan = generate_password_hash('', self.metode).split('$', 1)[0]
+        return hash_tersimpan.split('$', 1)[0] != self._awalan
+
+
+# -----------------------------------
+# PEMBATAS LAJU
+# -----------------------------------
+# Jendela geser per kunci (IP atau username), disimpan per proses seperti
+# page cache memory. Yang dicatat hanya waktu percobaan dalam jendela.
+
+
+def urai_batas(teks):
+    """'5/60' -> (5, 60.0): maksimal 5 percobaan per 60 detik."""
+    jumlah, detik = teks.split('/')
+    return int(jumlah), float(detik)
+
+
+class PembatasLaju:
+    def __init__(self, maks_kunci=10000):
+        self.maks_kunci = maks_kunci
+        # Urut dari yang paling lama tidak dipakai; kunci tertua dibuang saat penuh (LRU),
+        # jadi memori dan biaya per panggilan tetap terbatas walau banyak kunci masih aktif
+        self._catatan = OrderedDict()
+        self._kunci = threading.Lock()
+
+    def cek(self, kunci, batas):
+        """Catat satu percobaan; kembalikan 0 jika boleh, atau detik tunggu jika melebihi batas."""
+        jumlah, jendela = batas
+        sekarang = time.monotonic()
+        with self._kunci:
+            waktu = [t for t in self._catatan.get(kunci, ()) if t > sekarang - jendela]
+            self._catatan[kunci] = waktu
+            self._catatan.move_to_end(kunci)
+            if len(waktu) >= jumlah:
+                return max(1, int(waktu[0] + jendela - sekarang) + 1)
+            waktu.append(sekarang)
+            while len(self._catatan) > self.maks_kunci:
+                self._catatan.popitem(last=False)
+            return 0
+
+    def reset(self, kunci):
+        with self._kunci:
+            self._catatan.pop(kunci, None)
+
+
+# -----------------------------------
+# IDENTITAS USER UNTUK CACHE
+# -----------------------------------
+class IdentitasUser(UserMixin):
+    """Salinan ringan User (tanpa hash password) yang aman disimpan di cache."""
+
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+
+    @classmethod
+    def dari(cls, user):
+        return cls(user.id, user.username, bool(user.is_admin))
@@ -0,0 +1,90 @@
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import text
+
+# -----------------------------------
+# INDEKS FULL-TEXT (SQLite FTS5)
+# -----------------------------------
+# Tabel berita_fts memakai external content dari tabel berita, jadi isi
+# artikel tidak disimpan dua kali. Trigger menjaga indeks tetap sinkron
+# untuk setiap INSERT/UPDATE/DELETE, termasuk dari tambah() dan hapus().
+DDL_INDEKS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS berita_fts USING fts5(
+        judul, isi,
+        content='berita', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS berita_fts_ai AFTER INSERT ON berita BEGIN
+        INSERT INTO berita_fts(rowid, judul, isi) VALUES (new.id, new.judul, new.isi);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS berita_fts_ad AFTER DELETE ON berita BEGIN
+        INSERT INTO berita_fts(berita_fts, rowid, judul, isi) VALUES ('delete', old.id, old.judul, old.isi);
+    END""",
+    # Hanya perubahan judul/isi yang menyentuh indeks; UPDATE kolom lain (terbit, ringkasan, ...)
+    # tidak perlu menulis ulang FTS. Trigger versi lama (semua UPDATE) diganti.
+    "DROP TRIGGER IF EXISTS berita_fts_au",
+    """CREATE TRIGGER berita_fts_au AFTER UPDATE OF judul, isi ON berita BEGIN
+        INSERT INTO berita_fts(berita_fts, rowid, judul, isi) VALUES ('delete', old.id, old.judul, old.isi);
+        INSERT INTO berita_fts(rowid, judul, isi) VALUES (new.id, new.judul, new.isi);
+    END""",
+]
+
+# Bobot BM25 per kolom: kecocokan di judul lebih penting daripada di isi
+BOBOT_JUDUL = 10.0
+BOBOT_ISI = 1.0
+
+# Penanda sementara untuk highlight; diganti <mark> setelah teks di-escape
+_AWAL, _AKHIR = '\x02', '\x03'
+
+
+def tersedia(db):
+    return db.engine.dialect.name == 'sqlite'
+
+
+def siapkan_indeks(db):
+    with db.engine.begin() as conn:
+        baru = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='berita_fts'"
+        )).first() is None
+        for ddl in DDL_INDEKS:
+            conn.execute(text(ddl))
+        if baru:
+            # Indeks baru dibuat untuk database yang mungkin sudah berisi berita
+            conn.execute(text("INSERT INTO berita_fts(berita_fts) VALUES ('rebuild')"))
+
+
+def susun_query(q):
+    # Setiap kata dijadikan prefix query yang di-quote, jadi karakter spesial
+    # dari input pengguna tidak bisa merusak sintaks MATCH
+    kata = re.findall(r'\w+', q, re.UNICODE)
+    return ' '.join(f'"{k}"*' for k in kata)
+
+
+def _sorot(cuplikan):
+    teks = str(escape(cuplikan or ''))
+    return Markup(teks.replace(_AWAL, '<mark>').replace(_AKHIR, '</mark>'))
+
+
+def cari(db, q, offset, limit):
+    match = susun_query(q)
+    if not match:
+        return []
+
+    rows = db.session.execute(text(f"""
+        SELECT b.id, b.judul, b.gambar, b.penulis, b.waktu_baca,
+               snippet(berita_fts, 1, '{_AWAL}', '{_AKHIR}', '…', 24) AS cuplikan
+        FROM berita_fts
+        JOIN berita b ON b.id = berita_fts.rowid
+        WHERE berita_fts MATCH :match AND b.terbit
+        ORDER BY bm25(berita_fts, :bobot_judul, :bobot_isi)
+        LIMIT :limit OFFSET :offset
+    """), {
+        'match': match,
+        'bobot_judul': BOBOT_JUDUL,
+        'bobot_isi': BOBOT_ISI,
+        'limit': limit,
+        'offset': offset,
+    }).mappings().all()
+    return [dict(row, cuplikan=_sorot(row['cuplikan'])) for row in rows]
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+import uuid
+
+# -----------------------------------
+# PENYIMPANAN UPLOAD BERBASIS HASH ISI
+# -----------------------------------
+# File disimpan sebagai <ab>/<cd>/<sha256><ext>: nama berubah hanya jika isi
+# berubah, jadi file identik cukup disimpan sekali dan URL-nya aman di-cache
+# selamanya.
+UKURAN_CHUNK = 64 * 1024
+
+POLA_HASH = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}')
+POLA_SESI = re.compile(r'^[0-9a-f]{32}$')
+
+# Jumlah byte awal yang cukup untuk mengenali semua format di bawah
+_PANJANG_SNIFF = 16
+
+
+class UploadDitolak(ValueError):
+    pass
+
+
+class OffsetTidakCocok(UploadDitolak):
+    pass
+
+
+def kenali(awal):
+    """Tentukan ekstensi dari magic bytes, atau None jika bukan gambar yang didukung."""
+    if awal.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if awal.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if awal[:6] in (b'GIF87a', b'GIF89a'):
+        return '.gif'
+    if awal[:4] == b'RIFF' and awal[8:12] == b'WEBP':
+        return '.webp'
+    if awal[4:12] in (b'ftypavif', b'ftypavis'):
+        return '.avif'
+    return None
+
+
+def mimetype_diterima(mimetype):
+    # Content-Type dari browser hanya petunjuk awal; magic bytes tetap diperiksa
+    return not mimetype or mimetype.startswith('image/') or mimetype == 'application/octet-stream'
+
+
+def path_hash(digest, ext):
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def _baca_awal(stream):
+    awal = b''
+    while len(awal) < _PANJANG_SNIFF:
+        chunk = stream.read(_PANJANG_SNIFF - len(awal))
+        if not chunk:
+            break
+        awal += chunk
+    return awal
+
+
+def simpan(folder, stream, maks_byte=None):
+    """Simpan stream ke folder; kembalikan (path relatif, True jika file baru)."""
+    awal = _baca_awal(stream)
+    ext = kenali(awal)
+    if ext is None:
+        raise UploadDitolak('File harus berupa gambar JPEG, PNG, GIF, WebP, atau AVIF.')
+
+    h = hashlib.sha256(awal)
+    total = len(awal)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.unggah-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(awal)
+            while True:
+                chunk = stream.read(UKURAN_CHUNK)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if maks_byte and total > maks_byte:
+                    raise UploadDitolak('Ukuran file melebihi batas.')
+                h.update(chunk)
+                f.write(chunk)
+
+        relatif = path_hash(h.hexdigest(), ext)
+        tujuan = os.path.join(folder, relatif)
+        if os.path.exists(tujuan):
+            os.remove(tmp)
+            return relatif, False
+
+        os.makedirs(os.path.dirname(tujuan), exist_ok=True)
+        os.replace(tmp, tujuan)
+        return relatif, True
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def path_aman(folder, relatif):
+    """Path absolut `relatif` di dalam `folder`, atau None jika keluar darinya (mis. `../x`)."""
+    akar = os.path.realpath(folder)
+    path = os.path.realpath(os.path.join(akar, relatif))
+    return path if path.startswith(akar + os.sep) else None
+
+
+def hapus(folder, relatif):
+    path = path_aman(folder, relatif)
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def rapikan_folder(folder, relatif):
+    # Hapus folder shard yang sudah kosong (gagal diam-diam jika masih berisi)
+    if path_aman(folder, relatif) is None:
+        return
+    shard = os.path.dirname(relatif)
+    while shard:
+        try:
+            os.rmdir(os.path.join(folder, shard))
+        except OSError:
+            return
+        shard = os.path.dirname(shard)
+
+
+def immutable(relatif):
+    return bool(POLA_HASH.match(relatif))
+
+
+# -----------------------------------
+# UNGGAHAN BERTAHAP (RESUMABLE)
+# -----------------------------------
+# Klien membuat sesi, mengirim file per potongan dengan offset, dan bisa
+# melanjutkan dari offset terakhir jika koneksi putus. File sesi baru
+# dipindah ke penyimpanan hash saat berita disimpan.
+def path_sesi(folder_sesi, id_sesi):
+    if not POLA_SESI.match(id_sesi or ''):
+        raise UploadDitolak('ID unggahan tidak valid.')
+    return os.path.join(folder_sesi, id_sesi)
+
+
+def sesi_baru(folder_sesi):
+    os.makedirs(folder_sesi, exist_ok=True)
+    id_sesi = uuid.uuid4().hex
+    open(path_sesi(folder_sesi, id_sesi), 'xb').close()
+    return id_sesi
+
+
+def offset_sesi(folder_sesi, id_sesi):
+    try:
+        return os.path.getsize(path_sesi(folder_sesi, id_sesi))
+    except (OSError, UploadDitolak):
+        return None
+
+
+def tambah_potongan(folder_sesi, id_sesi, offset, stream, maks_byte=None):
+    path = path_sesi(folder_sesi, id_sesi)
+    with open(path, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() != offset:
+            raise OffsetTidakCocok('Offset unggahan tidak cocok.')
+        if offset == 0:
+            awal = _baca_awal(stream)
+            if len(awal) and kenali(awal) is None:
+                raise UploadDitolak('File harus berupa gambar JPEG, PNG, GIF, WebP, atau AVIF.')
+            f.write(awal)
+        while True:
+            chunk = stream.read(UKURAN_CHUNK)
+            if not chunk:
+                break
+            if maks_byte and f.tell() + len(chunk) > maks_byte:
+                raise UploadDitolak('Ukuran file melebihi batas.')
+            f.write(chunk)
+        return f.tell()
+
+
+def selesaikan_sesi(folder, folder_sesi, id_sesi, maks_byte=None):
+    path = path_sesi(folder_sesi, id_sesi)
+    try:
+        with open(path, 'rb') as f:
+            hasil = simpan(folder, f, maks_byte)
+    except FileNotFoundError:
+        raise UploadDitolak('Unggahan tidak ditemukan atau sudah kedaluwarsa.')
+    os.remove(path)
+    return hasil
+
+
+def bersihkan_sesi(folder_sesi, umur_detik):
+    batas = time.time() - umur_detik
+    try:
+        nama_nama = os.listdir(folder_sesi)
+    except OSError:
+        return
+    for nama in nama_nama:
+        path = os.path.join(folder_sesi, nama)
+        try:
+            if os.path.getmtime(path) < batas:
+                os.remove(path)
+        except OSError:
+            pass
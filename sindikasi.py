@@ -0,0 +1,108 @@
+import os
+from xml.sax.saxutils import escape
+
+from berkas import tulis_atomik, tulis_varian
+
+# -----------------------------------
+# FEED ATOM & SITEMAP XML
+# -----------------------------------
+# File XML dibangun di latar belakang saat berita terbit/dihapus lalu dilayani
+# apa adanya (plus varian .gz/.br) dengan ETag dari file. Sitemap dipecah per
+# rentang id: shard n memuat id n*UKURAN_SHARD+1 .. (n+1)*UKURAN_SHARD, jadi
+# berita baru atau yang dihapus hanya mengubah satu shard. Selama hanya ada
+# satu shard, /sitemap.xml langsung berisi daftar URL; setelahnya menjadi
+# sitemap index (batas protokol sitemap: 50.000 URL per file).
+UKURAN_SHARD = 50000
+NAMA_FEED = 'feed.xml'
+NAMA_SITEMAP = 'sitemap.xml'
+
+
+def nama_shard(nomor):
+    return f'sitemap-{nomor}.xml'
+
+
+def shard(id):
+    return (id - 1) // UKURAN_SHARD
+
+
+def rentang_shard(nomor):
+    return nomor * UKURAN_SHARD + 1, (nomor + 1) * UKURAN_SHARD
+
+
+def _waktu(dt):
+    # Kolom waktu disimpan sebagai UTC tanpa zona waktu
+    return dt.replace(microsecond=0).isoformat() + 'Z'
+
+
+def atom(judul, url_situs, url_feed, entri):
+    """Feed Atom; `entri` berisi dict judul, url, penulis, ringkasan, dibuat, diperbarui."""
+    diperbarui = max((e['diperbarui'] for e in entri), default=None)
+    baris = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f'<title>{escape(judul)}</title>',
+        f'<id>{escape(url_feed)}</id>',
+        f'<link rel="self" href="{escape(url_feed)}"/>',
+        f'<link rel="alternate" type="text/html" href="{escape(url_situs)}"/>',
+    ]
+    if diperbarui is not None:
+        baris.append(f'<updated>{_waktu(diperbarui)}</updated>')
+    for e in entri:
+        baris += [
+            '<entry>',
+            f'<title>{escape(e["judul"])}</title>',
+            f'<id>{escape(e["url"])}</id>',
+            f'<link rel="alternate" type="text/html" href="{escape(e["url"])}"/>',
+            f'<published>{_waktu(e["dibuat"])}</published>',
+            f'<updated>{_waktu(e["diperbarui"])}</updated>',
+            f'<author><name>{escape(e["penulis"])}</name></author>',
+            f'<summary>{escape(e["ringkasan"] or "")}</summary>',
+            '</entry>',
+        ]
+    baris.append('</feed>')
+    return ('\n'.join(baris) + '\n').encode('utf-8')
+
+
+def urlset(url):
+    """Sitemap berisi [(loc, lastmod atau None)]."""
+    baris = ['<?xml version="1.0" encoding="utf-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for loc, lastmod in url:
+        lastmod = f'<lastmod>{_waktu(lastmod)}</lastmod>' if lastmod else ''
+        baris.append(f'<url><loc>{escape(loc)}</loc>{lastmod}</url>')
+    baris.append('</urlset>')
+    return ('\n'.join(baris) + '\n').encode('utf-8')
+
+
+def indeks_sitemap(sitemap):
+    """Sitemap index berisi [(loc shard, lastmod atau None)]."""
+    baris = ['<?xml version="1.0" encoding="utf-8"?>',
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for loc, lastmod in sitemap:
+        lastmod = f'<lastmod>{_waktu(lastmod)}</lastmod>' if lastmod else ''
+        baris.append(f'<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>')
+    baris.append('</sitemapindex>')
+    return ('\n'.join(baris) + '\n').encode('utf-8')
+
+
+def tulis(folder, nama, data):
+    """Tulis file beserta varian .gz/.br-nya; file yang isinya sama tidak disentuh (ETag tetap)."""
+    path = os.path.join(folder, nama)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    # Varian ditulis lebih dulu supaya tidak pernah lebih tua dari file utamanya
+    tulis_varian(path, data)
+    tulis_atomik(path, data)
+    return True
+
+
+def hapus(folder, nama):
+    for akhiran in ('', '.gz', '.br'):
+        try:
+            os.remove(os.path.join(folder, nama + akhiran))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,72 @@
+// Gambar besar dikirim per potongan lewat /admin/unggah supaya unggahan bisa
+// dilanjutkan dari offset terakhir jika koneksi editor putus di tengah jalan.
+(function () {
+  const form = document.querySelector('form[data-unggah-bertahap]');
+  if (!form) return;
+
+  const input = form.querySelector('input[name="gambar"]');
+  const hidden = form.querySelector('input[name="unggahan"]');
+  const status = form.querySelector('[data-status-unggah]');
+  const AMBANG = 2 * 1024 * 1024;
+  const POTONGAN = 1024 * 1024;
+  const MAKS_GAGAL = 5;
+
+  const tunggu = (ms) => new Promise((ok) => setTimeout(ok, ms));
+
+  async function offsetServer(url) {
+    const r = await fetch(url, { method: 'HEAD' });
+    if (!r.ok) throw new Error('Unggahan tidak ditemukan.');
+    return parseInt(r.headers.get('Upload-Offset'), 10);
+  }
+
+  async function kirim(file) {
+    const mulai = await fetch(form.dataset.unggahBertahap, { method: 'POST' });
+    if (!mulai.ok) throw new Error('Gagal memulai unggahan.');
+    const sesi = await mulai.json();
+    const url = mulai.headers.get('Location');
+
+    let offset = 0;
+    let gagal = 0;
+    while (offset < file.size) {
+      let r;
+      try {
+        r = await fetch(url, {
+          method: 'PATCH',
+          headers: { 'Upload-Offset': String(offset) },
+          body: file.slice(offset, offset + POTONGAN),
+        });
+      } catch (e) {
+        // Koneksi putus: tunggu sebentar lalu lanjutkan dari offset server
+        if (++gagal > MAKS_GAGAL) throw new Error('Koneksi terputus, unggahan dihentikan.');
+        await tunggu(1000 * gagal);
+        offset = await offsetServer(url);
+        continue;
+      }
+      if (r.status === 409) {
+        offset = await offsetServer(url);
+        continue;
+      }
+      if (!r.ok) {
+        const data = await r.json().catch(() => ({}));
+        throw new Error(data.error || 'Unggahan ditolak server.');
+      }
+      offset = parseInt(r.headers.get('Upload-Offset'), 10);
+      gagal = 0;
+      status.textContent = `Mengunggah ${Math.round((offset * 100) / file.size)}%`;
+    }
+    return sesi.id;
+  }
+
+  form.addEventListener('submit', async (ev) => {
+    const file = input.files[0];
+    if (!file || file.size < AMBANG || hidden.value) return;
+    ev.preventDefault();
+    try {
+      hidden.value = await kirim(file);
+      input.value = '';
+      form.submit();
+    } catch (e) {
+      status.textContent = e.message;
+    }
+  });
+})();
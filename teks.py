@@ -0,0 +1,26 @@
+import math
+import re
+
+# -----------------------------------
+# RINGKASAN & WAKTU BACA
+# -----------------------------------
+# Dihitung sekali saat berita ditulis dan disimpan di kolomnya sendiri, supaya
+# halaman daftar tidak perlu memuat kolom isi sama sekali.
+PANJANG_RINGKASAN = 200
+KATA_PER_MENIT = 200
+
+
+def ringkas(isi, panjang=PANJANG_RINGKASAN):
+    """Nilai kolom turunan dari isi: {'ringkasan', 'jumlah_kata', 'waktu_baca'}."""
+    rapi = ' '.join(isi.split())
+    if len(rapi) > panjang:
+        # Potong di batas kata terakhir agar tidak berhenti di tengah kata
+        potongan = rapi[:panjang + 1]
+        spasi = potongan.rfind(' ')
+        rapi = (potongan[:spasi] if spasi > panjang // 2 else potongan[:panjang]).rstrip(' ,.;:') + '…'
+    jumlah_kata = len(re.findall(r'\w+', isi, re.UNICODE))
+    return {
+        'ringkasan': rapi,
+        'jumlah_kata': jumlah_kata,
+        'waktu_baca': max(1, math.ceil(jumlah_kata / KATA_PER_MENIT)),
+    }